@@ -5,18 +5,52 @@ ClickHouse client wrapper for batch inserts.
 
 from __future__ import annotations
 
+import logging
 import os
-from datetime import datetime, timezone
-from urllib.parse import urlparse
+import re
+from collections.abc import Iterator
+from typing import BinaryIO
 
 import clickhouse_connect
-import requests
+import zstandard
 
 from config import ClickHouseConfig
 from logging_config import getLogger
 
 logger = getLogger(__name__)
 
+# Table name part: word characters only (letters, digits, underscore).
+# Matched in C by fullmatch() instead of a per-character Python loop.
+_IDENTIFIER_PART_RE = re.compile(r"\w+")
+
+
+class _OneShotBody:
+    """Streamed request body that refuses to be replayed once data was read.
+
+    clickhouse-connect retries a request once when the server resets the
+    connection, resending the same body object. A chunk generator can't be
+    rewound, so the retry would send only the rest of the stream: a
+    truncated RowBinary/zstd body. Re-iterating before any chunk was taken
+    is safe (nothing was sent yet) and is allowed.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._started = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._started:
+            raise RuntimeError(
+                "Insert body was partially sent and cannot be replayed; "
+                "retry is not possible for streamed inserts"
+            )
+        return self._iter_chunks()
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self._started = True
+            yield chunk
+
 
 class ClickHouseClient:
     """Client for inserting rows into ClickHouse.
@@ -25,6 +59,38 @@ class ClickHouseClient:
     clickhouse-connect library for HTTP-based inserts.
     """
 
+    # ETL state columns in table order (id is MATERIALIZED and never written).
+    # Shared by all save_state() calls instead of being rebuilt per call, and
+    # used as get_state() result keys (the state query selects in this order).
+    _STATE_COLUMNS: tuple[str, ...] = (
+        "timestamp_start",
+        "timestamp_end",
+        "timestamp_progress",
+        "batch_window_seconds",
+        "batch_rows",
+        "batch_skipped_count",
+    )
+    # ClickHouse types of _STATE_COLUMNS (see ETL state table schema in README).
+    # Passing types with each insert lets clickhouse-connect skip the
+    # DESCRIBE TABLE round-trip it otherwise performs before every insert.
+    _STATE_COLUMN_TYPES: tuple[str, ...] = (
+        "DateTime",
+        "Nullable(DateTime)",
+        "Nullable(DateTime)",
+        "Nullable(Int64)",
+        "Nullable(Int64)",
+        "Nullable(Int64)",
+    )
+
+    # Server-side batching for single-row state inserts: ClickHouse buffers
+    # them and flushes into one part instead of creating a tiny part per
+    # insert. Waiting for the flush keeps state writes durable and surfaces
+    # errors, since the next run relies on this state.
+    _STATE_INSERT_SETTINGS: dict[str, int] = {
+        "async_insert": 1,
+        "wait_for_async_insert": 1,
+    }
+
     def __init__(self, config: ClickHouseConfig) -> None:
         """Initialize ClickHouse client.
 
@@ -36,52 +102,102 @@ class ClickHouseClient:
             config: ClickHouse connection configuration
 
         Raises:
+            ValueError: If configured table names are invalid
             Exception: If connection initialization fails
         """
         self._config = config
         self._table_metrics = config.table_metrics
         self._table_etl = config.table_etl
 
-        # Store URL and auth for HTTP streaming inserts
-        self._http_url = config.url
-        self._http_auth = None
-        if config.user:
-            # Password is normalized by ClickHouseConfig validator:
-            # if user is specified but password is None, it's converted to "".
-            # Empty string "" is different from None for HTTP Basic Auth.
-            self._http_auth = (config.user, config.password or "")
-        self._http_verify = not config.insecure
+        # Table names come from configuration and never change, so validate
+        # them once here instead of on every query/insert. ClickHouse doesn't
+        # support parameterized table names, so queries use f-strings.
+        self._validate_table_name(self._table_metrics, "table_metrics")
+        self._validate_table_name(self._table_etl, "table_etl")
+
+        # No FINAL: a completed run is written by a single save_state() insert
+        # carrying all columns, and nothing is written for that timestamp_start
+        # afterwards, so unmerged duplicates are identical and the raw row
+        # matching the filter is already the final one. ORDER BY the sorting
+        # key with LIMIT 1 lets ClickHouse read in order instead of merging
+        # all parts on every call. Timestamps are converted server-side with
+        # toUnixTimestamp(), so the row decodes to plain ints (NULL stays None)
+        # instead of datetime objects that need tz handling in Python.
+        self._get_state_query = f"""
+            SELECT
+                toUnixTimestamp(timestamp_start),
+                toUnixTimestamp(timestamp_end),
+                toUnixTimestamp(timestamp_progress),
+                batch_window_seconds,
+                batch_rows,
+                batch_skipped_count
+            FROM {self._table_etl}
+            WHERE timestamp_progress IS NOT NULL
+              AND timestamp_end IS NOT NULL
+              AND timestamp_end > timestamp_start
+            ORDER BY timestamp_start DESC
+            LIMIT 1
+        """  # nosec B608
 
-        try:
-            # Parse URL to extract host, port, and scheme
-            # clickhouse-connect 0.10.0+ requires host and port instead of url
-            parsed_url = urlparse(config.url)
-            host = parsed_url.hostname
-            if host is None:
-                raise ValueError(f"Invalid URL: missing hostname in {config.url}")
+        # Running jobs: timestamp_start values whose records carry no
+        # timestamp_end yet. max() skips NULLs, so it is NULL only when no
+        # closed record exists for that timestamp_start. A single grouped
+        # scan of raw records gives the same answer as FINAL (unmerged
+        # open + closed records count as completed) without merging parts.
+        # toUnixTimestamp() returns plain ints, so no per-row datetime
+        # conversion is needed on the Python side.
+        self._running_jobs_query = f"""
+            SELECT toUnixTimestamp(timestamp_start)
+            FROM {self._table_etl}
+            WHERE timestamp_start IS NOT NULL
+            GROUP BY timestamp_start
+            HAVING max(timestamp_end) IS NULL
+        """  # nosec B608
 
-            port = parsed_url.port
-            if port is None:
-                # Default ports based on scheme
-                port = 8443 if parsed_url.scheme == "https" else 8123
+        # Atomic INSERT with condition: only insert if no running job exists.
+        # Use subquery in WHERE clause to atomically check condition and insert.
+        # This ensures that the check and insert happen in a single atomic
+        # operation, preventing race conditions when multiple job instances try
+        # to start simultaneously. The subquery uses the same grouped
+        # running-jobs check as has_running_job(), so unmerged open + closed
+        # records of a completed run are not mistaken for a running job.
+        # timestamp_start is a server-side query parameter ({name:Type} is
+        # sent as param_timestamp_start), so the query text is built once and
+        # stays identical across calls instead of being formatted per call.
+        self._mark_start_query = f"""
+            INSERT INTO {self._table_etl} (timestamp_start)
+            SELECT toDateTime({{timestamp_start:UInt32}})
+            WHERE (
+                SELECT COUNT(*)
+                FROM ({self._running_jobs_query})
+            ) = 0
+        """  # nosec B608
 
-            # Determine if connection should be secure (HTTPS)
-            secure = parsed_url.scheme == "https"
+        # save_state() column name and type lists keyed by bitmask of
+        # provided fields
+        self._state_columns_cache: dict[int, tuple[list[str], list[str]]] = {}
 
+        try:
+            # Host, port and scheme are parsed from url once at config load
             # Type ignore: clickhouse_connect.get_client accepts None and empty string
             # for password but mypy types are too strict. Empty string "" is a valid
             # password value (different from None which means no password).
             # verify parameter controls TLS certificate verification
             # When insecure=True, verify=False disables certificate validation
+            # compress=True lets clickhouse-connect pick from its supported
+            # codecs: lz4 (listed first) for request bodies, and responses in
+            # a codec the server picks from the advertised list (lz4 first).
+            # zstd is used only for the streamed body in insert_from_file().
             self._client = clickhouse_connect.get_client(
-                host=host,
-                port=port,
+                host=config.host,
+                port=config.port,
                 username=config.user,
                 password=config.password,
-                secure=secure,
+                secure=config.secure,
                 connect_timeout=config.connect_timeout,
                 send_receive_timeout=config.send_receive_timeout,
                 verify=not config.insecure,
+                compress=config.compress,
             )
         except Exception as exc:
             logger.error(
@@ -93,61 +209,82 @@ class ClickHouseClient:
             )
             raise
 
-    def _to_unix_timestamp(self, value: datetime | int | None) -> int | None:
-        """Convert ClickHouse DateTime value to Unix timestamp (int).
+    def close(self) -> None:
+        """Close ClickHouse client.
 
-        ClickHouse returns datetime objects for DateTime columns. This method
-        converts them to Unix timestamps (int) for consistency with API.
+        Closes the clickhouse-connect client object. No pool_mgr is passed to
+        get_client(), so the client normally uses clickhouse-connect's shared
+        module-level connection pool, which close() leaves alive; its
+        connections are released when the process exits. Only a client-owned
+        pool (created by clickhouse-connect when TLS verification is
+        disabled) is cleared. Safe to call more than once.
+        """
+        self._client.close()
+
+    @staticmethod
+    def _iter_file_chunks(f: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+        """Read file in large chunks for streaming upload.
 
-        Important: clickhouse-connect returns naive datetime objects (without
-        timezone info). In Python, calling .timestamp() on a naive datetime
-        interprets it as local system time, not UTC. However, ClickHouse stores
-        DateTime values as UTC internally. This method explicitly converts
-        naive datetime to UTC-aware datetime before calling .timestamp() to
-        ensure correct conversion.
+        A file object passed to urllib3 is sent in 16 KiB blocks (its
+        default); large chunks cut per-chunk Python overhead, send() calls and
+        TLS records while memory stays bounded to one chunk.
 
         Args:
-            value: datetime object, int, or None from ClickHouse
+            f: File opened in binary mode
+            chunk_size: Read size in bytes
 
-        Returns:
-            Unix timestamp as int, or None if input is None
+        Yields:
+            Non-empty chunks of file data
         """
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            # Ensure datetime is in UTC before converting to timestamp
-            # clickhouse-connect may return datetime in local timezone
-            if value.tzinfo is None:
-                # Naive datetime - assume UTC (ClickHouse DateTime is
-                # timezone-agnostic, stored as UTC)
-                value = value.replace(tzinfo=timezone.utc)
-            elif value.tzinfo != timezone.utc:
-                # Convert to UTC
-                value = value.astimezone(timezone.utc)
-            return int(value.timestamp())
-        # Fallback for int (shouldn't happen with DateTime, but just in case)
-        return int(value)
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+    @staticmethod
+    def _iter_zstd_chunks(f: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+        """Compress file contents into zstd stream block by block.
+
+        Uses the fastest compression level: rows of one series share the
+        same pre-encoded name and labels, which zstd compresses several times
+        better than gzip while being several times faster.
+
+        Args:
+            f: File opened in binary mode
+            chunk_size: Read size in bytes for uncompressed data
+
+        Yields:
+            Non-empty chunks of zstd-compressed data
+        """
+        compressor = zstandard.ZstdCompressor(level=1).compressobj()
+        for chunk in ClickHouseClient._iter_file_chunks(f, chunk_size):
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
 
     def insert_from_file(self, file_path: str) -> None:
-        """Insert rows from TSV file into configured table.
+        """Insert rows from RowBinary file into configured table.
 
         Streams data from file directly to ClickHouse via HTTP POST.
         This method is memory-efficient as it streams file without
-        loading entire file into memory.
+        loading entire file into memory. When compression is enabled
+        in configuration, the body is zstd-compressed on the fly.
 
         Args:
-            file_path: Path to TSV file with data in TabSeparated format.
-                Each row must have columns in order: timestamp, name,
-                labels.key (ClickHouse array format), labels.value (ClickHouse
-                array format), and value. The id field is MATERIALIZED and always
-                auto-generated. Arrays are in ClickHouse format: ['a','b'].
-                No header row is included.
+            file_path: Path to file with data in RowBinary format.
+                Each row must have columns in order: timestamp (DateTime64(6)
+                as Int64 microseconds), name (String), labels.key
+                (Array(String)), labels.value (Array(String)), and value
+                (Float64). The id field is MATERIALIZED and always
+                auto-generated.
 
         Raises:
             FileNotFoundError: If file doesn't exist
             Exception: If ClickHouse insert operation fails
         """
-        if not os.path.exists(file_path):
+        # Single stat() call serves both the existence and the empty checks
+        try:
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
             error_msg = f"File not found: {file_path}"
             logger.error(
                 error_msg,
@@ -161,42 +298,49 @@ class ClickHouseClient:
                     ),
                 },
             )
-            raise FileNotFoundError(error_msg)
+            raise FileNotFoundError(error_msg) from None
 
         # Check if file is empty (no rows to insert)
         # This avoids unnecessary HTTP POST request for empty files
-        if os.path.getsize(file_path) == 0:
+        if file_size == 0:
             logger.info("No rows to insert (empty file)")
             return
 
-        self._validate_table_name(self._table_metrics, "table_metrics")
-
         # Use HTTP POST with streaming file upload (like curl --data-binary)
-        # TabSeparated format supports arrays and Nested structures via HTTP
+        # RowBinary is ClickHouse's binary row format: values arrive in their
+        # in-memory representation, so the server skips text parsing.
         # This is memory-efficient as it streams file directly to ClickHouse
         # without loading entire file into memory
         try:
-            # Construct query parameter for INSERT statement
             # id field is MATERIALIZED, so it's always auto-generated and
-            # cannot be overridden.
-            # TabSeparated format expects columns in table order:
+            # cannot be overridden. Without column names the INSERT targets
+            # all ordinary columns, and RowBinary expects them in table order:
             # timestamp, name, labels.key[], labels.value[], value
-            # Arrays are in ClickHouse format: ['a','b']
-            query = f"INSERT INTO {self._table_metrics} FORMAT TabSeparated"
-
             # Stream file directly to ClickHouse HTTP interface
-            # Using requests.post with file object enables streaming
-            # (like curl --data-binary @file.tsv)
+            # raw_insert() with a chunk generator sends the body with chunked
+            # transfer encoding (like curl --data-binary @file.bin) over the
+            # same connection pool, auth and TLS settings as all other queries.
+            # With compression enabled the body is zstd-compressed on the fly;
+            # ClickHouse decompresses request bodies based on Content-Encoding.
+            # Non-2xx responses are raised by clickhouse-connect.
+            # The body is a one-pass stream: if the connection is reset
+            # mid-upload, clickhouse-connect's single retry would resend the
+            # partly consumed generator, so _OneShotBody turns that retry
+            # into an error instead of a truncated insert.
+            chunk_size = self._config.insert_chunk_size
             with open(file_path, "rb") as f:
-                response = requests.post(
-                    self._http_url,
-                    params={"query": query},
-                    data=f,
-                    auth=self._http_auth,
-                    verify=self._http_verify,
-                    timeout=self._config.send_receive_timeout,
+                if self._config.compress:
+                    data = self._iter_zstd_chunks(f, chunk_size)
+                    compression: str | None = "zstd"
+                else:
+                    data = self._iter_file_chunks(f, chunk_size)
+                    compression = None
+                self._client.raw_insert(
+                    self._table_metrics,
+                    insert_block=_OneShotBody(data),
+                    fmt="RowBinary",
+                    compression=compression,
                 )
-                response.raise_for_status()
         except Exception as exc:
             error_msg = (
                 f"Failed to insert from file into ClickHouse via HTTP streaming: "
@@ -237,49 +381,16 @@ class ClickHouseClient:
             Exception: If query fails
         """
         try:
-            # Table name comes from configuration, not user input.
-            # ClickHouse doesn't support parameterized table names in queries,
-            # so we validate the table name format and use f-string.
-            self._validate_table_name(self._table_etl, "table_etl")
-            # FINAL is used to get the latest merged version from ReplacingMergeTree.
-            # This is safe for performance because only one ETL job instance writes
-            # to this table, so the table size remains small.
-            query = f"""
-                SELECT
-                    timestamp_start,
-                    timestamp_end,
-                    timestamp_progress,
-                    batch_window_seconds,
-                    batch_rows,
-                    batch_skipped_count
-                FROM {self._table_etl} FINAL
-                WHERE timestamp_progress IS NOT NULL
-                  AND timestamp_end IS NOT NULL
-                  AND timestamp_end > timestamp_start
-                ORDER BY timestamp_start DESC
-                LIMIT 1
-            """  # nosec B608
-            result = self._client.query(query)
+            # Query is built once in __init__ (table name is validated there)
+            result = self._client.query(self._get_state_query)
 
             if not result.result_rows:
-                return {
-                    "timestamp_progress": None,
-                    "timestamp_start": None,
-                    "timestamp_end": None,
-                    "batch_window_seconds": None,
-                    "batch_rows": None,
-                    "batch_skipped_count": None,
-                }
-
-            row = result.result_rows[0]
-            return {
-                "timestamp_start": self._to_unix_timestamp(row[0]),
-                "timestamp_end": self._to_unix_timestamp(row[1]),
-                "timestamp_progress": self._to_unix_timestamp(row[2]),
-                "batch_window_seconds": int(row[3]) if row[3] is not None else None,
-                "batch_rows": int(row[4]) if row[4] is not None else None,
-                "batch_skipped_count": int(row[5]) if row[5] is not None else None,
-            }
+                return dict.fromkeys(self._STATE_COLUMNS)
+
+            # Query selects columns in _STATE_COLUMNS order with timestamps
+            # already converted by toUnixTimestamp(), so values are ints or
+            # None as returned and map onto column names directly
+            return dict(zip(self._STATE_COLUMNS, result.result_rows[0]))
         except Exception as exc:
             error_msg = (
                 f"Failed to read state from ClickHouse: {type(exc).__name__}: {exc}"
@@ -324,7 +435,7 @@ class ClickHouseClient:
                 raise ValueError(
                     f"Invalid {field_name} format: {table_name} (empty part)"
                 )
-            if not all(c.isalnum() or c == "_" for c in part):
+            if not _IDENTIFIER_PART_RE.fullmatch(part):
                 raise ValueError(
                     f"Invalid {field_name} format: {table_name} "
                     f"(invalid characters in part: {part})"
@@ -342,13 +453,15 @@ class ClickHouseClient:
         """Save ETL state in ClickHouse.
 
         Always uses INSERT to save state. ReplacingMergeTree handles
-        deduplication based on ORDER BY key (timestamp_start). When reading state,
-        FINAL is used to get the latest merged version after automatic merges.
+        deduplication based on ORDER BY key (timestamp_start) in background
+        merges; reads don't depend on them.
 
         This approach works because:
         1. ClickHouse doesn't allow updating key columns via ALTER TABLE UPDATE
         2. ReplacingMergeTree automatically merges rows with same ORDER BY key
-        3. FINAL ensures we read the latest version after merges
+        3. A completed run is written by a single insert carrying all columns,
+           so get_state() reads it as is (ORDER BY timestamp_start DESC
+           LIMIT 1), whether or not it has been merged yet
         4. When _mark_start() creates record with timestamp_start, and
            _save_state_after_success() adds other fields with same timestamp_start,
            they will be merged into single record
@@ -371,61 +484,60 @@ class ClickHouseClient:
             Exception: If insert fails
         """
         try:
-            # Always use INSERT instead of UPDATE.
-            # ReplacingMergeTree handles deduplication based on ORDER BY key
-            # (timestamp_start). When reading state, FINAL is used to get the
-            # latest merged version. This approach works because:
-            # 1. ClickHouse doesn't allow updating key columns via ALTER TABLE UPDATE
-            # 2. ReplacingMergeTree automatically merges rows with same ORDER BY key
-            # 3. FINAL ensures we read the latest version after merges
-            columns = []
-            values = []
-
-            # Save fields in table order:
-            # timestamp_start, timestamp_end, timestamp_progress, ...
-            # Convert Unix timestamps to datetime objects for DateTime columns.
-            # clickhouse-connect requires datetime objects for DateTime columns,
-            # not raw Unix timestamps (int). Passing int directly may cause
-            # incorrect interpretation (e.g., as days since epoch instead of seconds).
-            if timestamp_start is not None:
-                columns.append("timestamp_start")
-                values.append(datetime.fromtimestamp(timestamp_start, tz=timezone.utc))
-            if timestamp_end is not None:
-                columns.append("timestamp_end")
-                values.append(datetime.fromtimestamp(timestamp_end, tz=timezone.utc))
-            if timestamp_progress is not None:
-                columns.append("timestamp_progress")
-                values.append(
-                    datetime.fromtimestamp(timestamp_progress, tz=timezone.utc)
-                )
-            if batch_window_seconds is not None:
-                columns.append("batch_window_seconds")
-                # Type ignore: values list contains mixed types (datetime for
-                # timestamps, int for batch fields), which is correct for
-                # clickhouse-connect insert
-                values.append(batch_window_seconds)  # type: ignore[arg-type]
-            if batch_rows is not None:
-                columns.append("batch_rows")
-                # Type ignore: values list contains mixed types (datetime for
-                # timestamps, int for batch fields), which is correct for
-                # clickhouse-connect insert
-                values.append(batch_rows)  # type: ignore[arg-type]
-            if batch_skipped_count is not None:
-                columns.append("batch_skipped_count")
-                # Type ignore: values list contains mixed types (datetime for
-                # timestamps, int for batch fields), which is correct for
-                # clickhouse-connect insert
-                values.append(batch_skipped_count)  # type: ignore[arg-type]
-
-            if not columns:
+            # Always use INSERT instead of UPDATE: ClickHouse doesn't allow
+            # updating key columns via ALTER TABLE UPDATE. ReplacingMergeTree
+            # deduplicates rows with same ORDER BY key (timestamp_start) in
+            # background merges; reads don't need FINAL because a completed
+            # run is a single row carrying all columns.
+
+            # Unix timestamps are passed as ints: with the explicit DateTime
+            # column type names clickhouse-connect writes them as seconds
+            # since epoch directly, no datetime objects are needed.
+            # Values are listed in _STATE_COLUMNS (table) order.
+            state: tuple[int | None, ...] = (
+                timestamp_start,
+                timestamp_end,
+                timestamp_progress,
+                batch_window_seconds,
+                batch_rows,
+                batch_skipped_count,
+            )
+            # Bit i of mask is set when state[i] is provided. Column name and
+            # type lists are memoized per mask: callers use only a few field
+            # combinations (start marker, completion, progress), so lists are
+            # built once.
+            mask = 0
+            for i, value in enumerate(state):
+                if value is not None:
+                    mask |= 1 << i
+
+            if not mask:
                 return  # Nothing to insert
 
-            self._validate_table_name(self._table_etl, "table_etl")
+            cached = self._state_columns_cache.get(mask)
+            if cached is None:
+                cached = (
+                    [
+                        column
+                        for i, column in enumerate(self._STATE_COLUMNS)
+                        if mask & (1 << i)
+                    ],
+                    [
+                        column_type
+                        for i, column_type in enumerate(self._STATE_COLUMN_TYPES)
+                        if mask & (1 << i)
+                    ],
+                )
+                self._state_columns_cache[mask] = cached
+            columns, column_types = cached
+            values = [value for value in state if value is not None]
 
             self._client.insert(
                 self._table_etl,
                 [values],
                 column_names=columns,
+                column_type_names=column_types,
+                settings=self._STATE_INSERT_SETTINGS,
             )
         except Exception as exc:
             logger.error(
@@ -437,60 +549,33 @@ class ClickHouseClient:
             )
             raise
 
-    def _get_running_job_timestamps(self, use_final: bool = True) -> list[int]:
+    def _get_running_job_timestamps(self) -> list[int]:
         """Get list of timestamp_start values for running jobs.
 
         A running job is one that has an open record (timestamp_end IS NULL)
-        without a corresponding closed record (timestamp_end IS NOT NULL
-        AND timestamp_end > timestamp_start) for the same timestamp_start.
+        without a corresponding closed record (timestamp_end IS NOT NULL)
+        for the same timestamp_start.
 
-        This handles ReplacingMergeTree unmerged records correctly:
+        This handles ReplacingMergeTree unmerged records correctly without
+        FINAL by grouping raw records by timestamp_start:
         - If only open record exists → job is running
         - If both open and closed records exist → job is completed (merge pending)
         - If only closed record exists → job is completed
         - If no records → no job running
 
-        Args:
-            use_final: If True, use FINAL to get merged view. If False, check
-                raw records (useful for atomic operations where FINAL is expensive).
-
         Returns:
             List of timestamp_start values for running jobs
 
         Raises:
             Exception: If query fails
         """
-        self._validate_table_name(self._table_etl, "table_etl")
-
-        # Use subquery to apply FINAL when needed, as ClickHouse doesn't support
-        # "FROM table FINAL AS alias" syntax directly
-        if use_final:
-            table_expr = f"(SELECT * FROM {self._table_etl} FINAL)"  # nosec B608
-        else:
-            table_expr = self._table_etl
-
-        # Use LEFT JOIN instead of NOT EXISTS to avoid correlated subquery issues
-        # in ClickHouse (especially Altinity builds) when using FINAL in subqueries.
-        # The condition "closed.timestamp_start IS NULL" ensures we only get open
-        # records without a corresponding closed record.
-        # Simplified logic: a running job is one that has timestamp_start
-        # but no timestamp_end (or timestamp_end IS NULL).
-        # If a record has timestamp_end, it's considered completed.
-        query = f"""
-            SELECT DISTINCT timestamp_start
-            FROM {table_expr}
-            WHERE timestamp_start IS NOT NULL
-              AND timestamp_end IS NULL
-        """  # nosec B608
+        # Query is built once in __init__ (table name is validated there)
+        query = self._running_jobs_query
 
         result = self._client.query(query)
-        # Filter out None values (shouldn't happen
-        # due to WHERE timestamp_start IS NOT NULL)
-        return [
-            ts
-            for row in result.result_rows
-            if (ts := self._to_unix_timestamp(row[0])) is not None
-        ]
+        # Values are already Unix timestamps (toUnixTimestamp in the query)
+        # and never NULL due to WHERE timestamp_start IS NOT NULL
+        return [int(row[0]) for row in result.result_rows]
 
     def has_running_job(self) -> bool:
         """Check if there is a running job in the ETL table.
@@ -506,7 +591,7 @@ class ClickHouseClient:
             Exception: If query fails
         """
         try:
-            running_timestamps = self._get_running_job_timestamps(use_final=True)
+            running_timestamps = self._get_running_job_timestamps()
             has_running = len(running_timestamps) > 0
             if has_running:
                 logger.info(
@@ -546,9 +631,9 @@ class ClickHouseClient:
         - If there's no open record → no job running, allow start
 
         Note: Uses toDateTime() to explicitly convert Unix timestamp (int) to
-        DateTime type in ClickHouse. After insertion, verifies success by
-        checking running jobs without FINAL (new inserts are visible immediately
-        before merge in ReplacingMergeTree).
+        DateTime type in ClickHouse. Whether the record was inserted is taken
+        from the INSERT summary (written_rows), then a single running-jobs
+        query confirms this job is the only running one.
 
         Args:
             timestamp_start: Unix timestamp when job started (int, seconds since epoch)
@@ -560,87 +645,36 @@ class ClickHouseClient:
             Exception: If query fails
         """
         try:
-            self._validate_table_name(self._table_etl, "table_etl")
-
-            # Atomic INSERT with condition: only insert if no running job exists.
-            # A running job is one that has an open record (timestamp_end IS NULL)
-            # without a corresponding closed record (timestamp_end IS NOT NULL
-            # AND timestamp_end > timestamp_start).
-            # Use subquery in WHERE clause to atomically check condition and insert.
-            # This ensures that the check and insert happen in a single atomic
-            # operation, preventing race conditions when multiple job instances try
-            # to start simultaneously. Use FINAL in subquery to ensure we see merged
-            # state after
-            # initialization or previous merges. This is important because
-            # after initialization, records may not be merged yet, and we
-            # need to see the actual state (merged records) to correctly
-            # determine if there are running jobs.
-            # Simplified logic: a running job is one that has timestamp_start
-            # but no timestamp_end (or timestamp_end IS NULL).
-            # If a record has timestamp_end, it's considered completed.
-            # Check running jobs count before INSERT for logging
-            running_count_query = f"""
-                SELECT COUNT(*)
-                FROM (SELECT * FROM {self._table_etl} FINAL)
-                WHERE timestamp_start IS NOT NULL
-                  AND timestamp_end IS NULL
-            """  # nosec B608
-
-            running_count_result = self._client.query(running_count_query)
-            running_count = (
-                running_count_result.result_rows[0][0]
-                if running_count_result.result_rows
-                else 0
-            )
-
-            logger.debug(
-                f"Checking running jobs before INSERT: count={running_count}, "
-                f"timestamp_start={timestamp_start}",
-                extra={
-                    "clickhouse_client.try_mark_start.running_count": running_count,
-                    "clickhouse_client.try_mark_start.timestamp_start": (
-                        timestamp_start
-                    ),
-                },
-            )
+            # command() returns the query summary for statements without a
+            # result set: written_rows tells whether the conditional INSERT
+            # actually inserted our record, so no separate verification
+            # SELECT is needed
+            written_rows = self._client.command(
+                self._mark_start_query,
+                parameters={"timestamp_start": timestamp_start},
+            ).written_rows
+
+            # DEBUG is disabled by default: check the level first so neither
+            # the extra dict is built nor the message formatted on the
+            # success path unless the record is actually emitted
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Conditional start INSERT: written_rows=%s, timestamp_start=%s",
+                    written_rows,
+                    timestamp_start,
+                    extra={
+                        "clickhouse_client.try_mark_start.written_rows": written_rows,
+                        "clickhouse_client.try_mark_start.timestamp_start": (
+                            timestamp_start
+                        ),
+                    },
+                )
 
-            # Atomic INSERT with subquery in WHERE clause to ensure atomicity.
-            # The subquery checks for running jobs at the moment of INSERT execution,
-            # not at the moment of Python variable evaluation, preventing race
-            # conditions.
-            query = f"""
-                INSERT INTO {self._table_etl} (timestamp_start)
-                SELECT toDateTime({timestamp_start})
-                WHERE (
-                    SELECT COUNT(*)
-                    FROM (SELECT * FROM {self._table_etl} FINAL)
-                    WHERE timestamp_start IS NOT NULL
-                      AND timestamp_end IS NULL
-                ) = 0
-            """  # nosec B608
-
-            self._client.query(query)
-
-            # Verify insertion succeeded by checking if our record exists
-            # Don't use FINAL here - new inserts are visible immediately
-            # (before merge). Check if our timestamp_start exists as a running
-            # job (timestamp_end IS NULL)
-            verify_query = f"""
-                SELECT timestamp_start
-                FROM {self._table_etl}
-                WHERE timestamp_start = toDateTime({timestamp_start})
-                  AND timestamp_end IS NULL
-                LIMIT 1
-            """  # nosec B608
-
-            verify_result = self._client.query(verify_query)
-
-            # If our record exists, insertion succeeded
-            if verify_result.result_rows:
-                # Double-check: ensure we're the only running job
-                # Use FINAL to see merged state - previous job should have
-                # timestamp_end set after successful completion
-                running_timestamps = self._get_running_job_timestamps(use_final=True)
+            if written_rows:
+                # Double-check: ensure we're the only running job. INSERT ...
+                # SELECT is not transactional, so two instances starting at
+                # the same moment may both pass the subquery condition.
+                running_timestamps = self._get_running_job_timestamps()
                 if (
                     len(running_timestamps) == 1
                     and running_timestamps[0] == timestamp_start
@@ -665,7 +699,7 @@ class ClickHouseClient:
                     )
             else:
                 logger.warning(
-                    "Insert verification failed: record not found after INSERT",
+                    "Conditional INSERT wrote no rows: another job is running",
                     extra={
                         "clickhouse_client.try_mark_start_verification_failed.timestamp_start": (  # noqa: E501
                             timestamp_start
@@ -8,28 +8,80 @@ timestamps are stored in ClickHouse ETL table and are not part of this config.
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Self
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from logging_config import getLogger
 
 logger = getLogger(__name__)
 
+# Structured fields for the config validation error log. They never depend on
+# the failure itself, so the mapping is built once at import time.
+_CONFIG_ERROR_EXTRA = {
+    "config.config_type_error.expected": "Config",
+    "config.config_type_error.actual": "invalid",
+    "config.config_type_error.path": "env",
+}
 
-class PrometheusConfig(BaseSettings):
-    """Prometheus or Mimir connection configuration.
 
-    Configuration for connecting to Prometheus-compatible API. Business state
-    (timestamps) is stored in ClickHouse ETL table, not in this config object.
+class _Settings(BaseSettings):
+    """Base for all settings read from environment variables.
+
+    Holds the shared settings configuration; pydantic merges model_config
+    with subclasses, so each subclass only sets its env_prefix.
     """
 
     model_config = SettingsConfigDict(
-        env_prefix="PROMETHEUS_",
         case_sensitive=False,
         extra="ignore",
         env_ignore_empty=True,
     )
 
+
+class _BasicAuthSettings(_Settings):
+    """Base for connection settings with optional HTTP Basic Auth.
+
+    Subclasses redefine user and password with their own descriptions;
+    the password normalization validator is registered once here.
+    """
+
+    user: str | None = None
+    password: str | None = None
+
+    @model_validator(mode="after")
+    def normalize_password(self) -> Self:
+        """Normalize password: if user is specified but password is None,
+        convert password to empty string.
+
+        This handles the case when the password variable (e.g.
+        PROMETHEUS_PASSWORD, CLICKHOUSE_PASSWORD) is set to empty string
+        in environment variables. With env_ignore_empty=True, empty strings
+        are converted to None, but HTTP Basic Auth requires explicit
+        authentication even with empty password when user is specified.
+
+        Returns:
+            Self with normalized password field
+        """
+        if self.user is not None and self.password is None:
+            # This is not a hardcoded password, but normalization of empty
+            # password value. Empty string is required for HTTP Basic Auth
+            # when password is empty but user is specified.
+            self.password = ""  # nosec B105
+        return self
+
+
+class PrometheusConfig(_BasicAuthSettings):
+    """Prometheus or Mimir connection configuration.
+
+    Configuration for connecting to Prometheus-compatible API. Business state
+    (timestamps) is stored in ClickHouse ETL table, not in this config object.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="PROMETHEUS_")
+
     url: str = Field(..., description="Base URL of Prometheus/Mimir")
     user: str | None = Field(
         default=None,
@@ -55,40 +107,15 @@ class PrometheusConfig(BaseSettings):
         ),
     )
 
-    @model_validator(mode="after")
-    def normalize_password(self) -> PrometheusConfig:
-        """Normalize password: if user is specified but password is None,
-        convert password to empty string.
-
-        This handles the case when PROMETHEUS_PASSWORD is set to empty string
-        in environment variables. With env_ignore_empty=True, empty strings
-        are converted to None, but HTTP Basic Auth requires explicit
-        authentication even with empty password when user is specified.
-
-        Returns:
-            Self with normalized password field
-        """
-        if self.user is not None and self.password is None:
-            # This is not a hardcoded password, but normalization of empty
-            # password value. Empty string is required for HTTP Basic Auth
-            # when password is empty but user is specified.
-            self.password = ""  # nosec B105
-        return self
-
 
-class ClickHouseConfig(BaseSettings):
+class ClickHouseConfig(_BasicAuthSettings):
     """ClickHouse connection configuration.
 
     Configuration for ClickHouse HTTP interface. Used for batch inserts
     of processed metric data.
     """
 
-    model_config = SettingsConfigDict(
-        env_prefix="CLICKHOUSE_",
-        case_sensitive=False,
-        extra="ignore",
-        env_ignore_empty=True,
-    )
+    model_config = SettingsConfigDict(env_prefix="CLICKHOUSE_")
 
     url: str = Field(..., description="Base URL of ClickHouse HTTP interface")
     user: str | None = Field(default=None, description="Optional ClickHouse user")
@@ -111,6 +138,19 @@ class ClickHouseConfig(BaseSettings):
         default=False,
         description="Disable TLS verification when true",
     )
+    compress: bool = Field(
+        default=True,
+        description=(
+            "Enable compression for ClickHouse requests: lz4 for "
+            "clickhouse-connect queries and responses, zstd for streaming "
+            "file inserts"
+        ),
+    )
+    insert_chunk_size: int = Field(
+        default=1024 * 1024,
+        description="Read size in bytes for streaming file inserts (1 MiB)",
+        gt=0,
+    )
     table_metrics: str = Field(
         default="default.metrics",
         description="Target table name for inserts",
@@ -120,28 +160,59 @@ class ClickHouseConfig(BaseSettings):
         description="Table name for storing ETL job state",
     )
 
+    # Connection parameters parsed from url once by parse_url validator
+    _host: str = PrivateAttr(default="")
+    _port: int = PrivateAttr(default=0)
+    _secure: bool = PrivateAttr(default=False)
+
     @model_validator(mode="after")
-    def normalize_password(self) -> ClickHouseConfig:
-        """Normalize password: if user is specified but password is None,
-        convert password to empty string.
+    def parse_url(self) -> Self:
+        """Parse url into host, port and scheme for clickhouse-connect.
 
-        This handles the case when CLICKHOUSE_PASSWORD is set to empty string
-        in environment variables. With env_ignore_empty=True, empty strings
-        are converted to None, but ClickHouse requires explicit authentication
-        even with empty password when user is specified.
+        clickhouse-connect 0.10.0+ requires host and port instead of url.
+        Parsing at config load fails fast on malformed URLs, before any
+        client is created.
 
         Returns:
-            Self with normalized password field
+            Self with parsed connection parameters
+
+        Raises:
+            ValueError: If url has no hostname or has invalid port
         """
-        if self.user is not None and self.password is None:
-            # This is not a hardcoded password, but normalization of empty
-            # password value. Empty string is required for ClickHouse
-            # authentication when password is empty but user is specified.
-            self.password = ""  # nosec B105
+        parsed_url = urlparse(self.url)
+        host = parsed_url.hostname
+        if host is None:
+            raise ValueError(f"Invalid URL: missing hostname in {self.url}")
+
+        # Determine if connection should be secure (HTTPS)
+        secure = parsed_url.scheme == "https"
+        port = parsed_url.port
+        if port is None:
+            # Default ports based on scheme
+            port = 8443 if secure else 8123
+
+        self._host = host
+        self._port = port
+        self._secure = secure
         return self
 
+    @property
+    def host(self) -> str:
+        """ClickHouse hostname parsed from url."""
+        return self._host
+
+    @property
+    def port(self) -> int:
+        """ClickHouse port from url, or scheme default (8123/8443)."""
+        return self._port
+
+    @property
+    def secure(self) -> bool:
+        """Whether url uses HTTPS."""
+        return self._secure
 
-class EtlConfig(BaseSettings):
+
+class EtlConfig(_Settings):
     """ETL job configuration options.
 
     Controls ETL processing behavior. Batch window size determines how much
@@ -149,12 +220,7 @@ class EtlConfig(BaseSettings):
     to avoid missing data at boundaries.
     """
 
-    model_config = SettingsConfigDict(
-        env_prefix="",
-        case_sensitive=False,
-        extra="ignore",
-        env_ignore_empty=True,
-    )
+    model_config = SettingsConfigDict(env_prefix="")
 
     batch_window_size_seconds: int = Field(
         default=300,
@@ -231,12 +297,18 @@ def load_config() -> Config:
         )
     except ValidationError as exc:
         # Log configuration error details according to schema
-        logger.error(
-            "Configuration validation failed",
-            extra={
-                "config.config_type_error.expected": "Config",
-                "config.config_type_error.actual": "invalid",
-                "config.config_type_error.path": "env",
-            },
-        )
-        raise ValueError(f"Configuration validation failed: {exc}") from exc
+        logger.error("Configuration validation failed", extra=_CONFIG_ERROR_EXTRA)
+        # Compact one-line message from structured errors: skips pydantic's
+        # full rendering (docs URLs per error) and never echoes input values,
+        # which may contain passwords
+        messages = []
+        for error in exc.errors(
+            include_url=False, include_context=False, include_input=False
+        ):
+            loc = ".".join(map(str, error["loc"]))
+            # Errors from model-level validators have no field location
+            messages.append(f"{loc}: {error['msg']}" if loc else error["msg"])
+        errors = "; ".join(messages)
+        raise ValueError(
+            f"Configuration validation failed: {exc.title}: {errors}"
+        ) from exc
@@ -9,7 +9,7 @@ Implements streaming ETL algorithm with three distinct stages:
 - Calculate processing window based on progress and batch window size.
 - Extract: Stream Prometheus response to file (prometheus_raw_*.json)
 - Transform: Stream parse JSON, process and transform data to ClickHouse format
-- Load: Stream processed data to ClickHouse (etl_processed_*.tsv)
+- Load: Stream processed data to ClickHouse (etl_processed_*.bin, RowBinary)
 - Save updated progress and end timestamps, plus window size and rows count
   to ClickHouse.
 
@@ -19,13 +19,13 @@ memory, enabling handling of very large Prometheus responses.
 
 from __future__ import annotations
 
-import math
 import os
+import struct
 import tempfile
 import time
 from decimal import Decimal
 from pathlib import Path
-from typing import BinaryIO, TextIO
+from typing import BinaryIO
 
 import ijson
 
@@ -413,8 +413,8 @@ class EtlJob:
 
         Returns:
             Tuple of (file_path, rows_count, prom_response_path, skipped_count)
-            where file_path is path to TSV file with processed data in
-            TabSeparated format, rows_count is number of rows written,
+            where file_path is path to file with processed data in
+            RowBinary format, rows_count is number of rows written,
             prom_response_path is path to the original Prometheus response file,
             and skipped_count is number of value pairs skipped due to format errors
 
@@ -471,7 +471,7 @@ class EtlJob:
 
         # Stage 2 - Transform: Stream parse JSON and process data
         output_fd, output_file_path = self._create_temp_file(
-            prefix="etl_processed_", suffix=".tsv"
+            prefix="etl_processed_", suffix=".bin"
         )
 
         rows_count = 0
@@ -479,7 +479,7 @@ class EtlJob:
         try:
             with (
                 open(prom_response_path, "rb") as input_f,
-                os.fdopen(output_fd, "w", encoding="utf-8", newline="") as output_f,
+                os.fdopen(output_fd, "wb") as output_f,
             ):
                 # Use event-based streaming parsing to avoid loading entire series
                 # values arrays into memory. Each value point is processed individually
@@ -543,7 +543,7 @@ class EtlJob:
         return output_file_path, rows_count, prom_response_path, skipped_count
 
     def _stream_parse_prometheus_response(
-        self, input_f: BinaryIO, output_f: TextIO
+        self, input_f: BinaryIO, output_f: BinaryIO
     ) -> tuple[int, int, int]:
         """Stream parse Prometheus JSON response using event-based parsing.
 
@@ -553,7 +553,7 @@ class EtlJob:
 
         Args:
             input_f: Binary file object with Prometheus JSON response
-            output_f: Text file object for writing TSV output
+            output_f: Binary file object for writing RowBinary output
 
         Returns:
             Tuple of (rows_count, series_count, skipped_count) where rows_count
@@ -575,78 +575,37 @@ class EtlJob:
         current_labels: dict[str, str] = {}
         in_values_array = False
         current_value_pair: list[float] = []
-        value_pair_index = 0
 
-        # Pre-computed labels formatting (only computed once per series)
-        # These are reused for all value points in the series
-        labels_keys_str = ""
-        labels_values_str = ""
-        metric_name_escaped = ""
+        # Pre-encoded series columns (only computed once per series)
+        # Holds RowBinary name, labels.key and labels.value - everything between
+        # timestamp and value - so each value point only packs ts and value.
+        # Initially empty name and empty arrays.
+        series_columns = b"\x00\x00\x00"
+        # Bound methods are looked up once, not on every value point:
+        # pack_row is rebound together with series_columns for each series
+        pack_row = self._make_row_struct(series_columns).pack
+        write_output = output_f.write
 
         # Parse JSON events stream
         # use_float=True ensures numbers are returned as float, not Decimal
         parser = ijson.parse(input_f, use_float=True)
 
         for prefix, event, value in parser:
-            # Track when we enter a new series (data.result.item)
-            if prefix == "data.result.item" and event == "start_map":
-                # New series started - reset state
-                current_metric = {}
-                current_metric_name = ""
-                current_labels = {}
-                in_values_array = False
-                current_value_pair = []
-                value_pair_index = 0
-                series_count += 1
-
-            # Collect metric object (data.result.item.metric.*)
-            elif prefix.startswith("data.result.item.metric."):
-                if event == "string":
-                    # Extract label key from prefix
-                    # (e.g., "data.result.item.metric.__name__")
-                    label_key = prefix.split(".")[-1]
-                    current_metric[label_key] = str(value)
-
-            # Detect when metric object is complete
-            elif prefix == "data.result.item.metric" and event == "end_map":
-                # Metric object complete - extract metric_name and labels
-                current_metric_name = current_metric.get("__name__", "")
-                current_labels = current_metric.copy()
-                current_labels.pop("__name__", None)
-
-                # Pre-compute labels formatting for this series (reused for all points)
-                labels_sorted = dict(sorted(current_labels.items()))
-                labels_keys = list(labels_sorted.keys())
-                labels_values = list(labels_sorted.values())
-                labels_keys_str = self._format_clickhouse_array(labels_keys)
-                labels_values_str = self._format_clickhouse_array(labels_values)
-                metric_name_escaped = self._escape_tabseparated_chars(
-                    current_metric_name
-                )
-
-            # Track when we enter values array (data.result.item.values)
-            elif prefix == "data.result.item.values" and event == "start_array":
-                in_values_array = True
-                current_value_pair = []
-                value_pair_index = 0
-
-            # Track when we exit values array
-            elif prefix == "data.result.item.values" and event == "end_array":
-                in_values_array = False
-
             # Process each value point in values array
+            # Checked first: value point events outnumber all other events by
+            # orders of magnitude, so they should not fall through the series
+            # and metric comparisons below.
             # Each point is an array [timestamp, value]
             # Events: start_array, number (timestamp), number/string (value), end_array
             # ijson uses "data.result.item.values.item" prefix for array items
             # and "data.result.item.values.item.item" for nested array elements
-            elif in_values_array:
+            if in_values_array:
                 # Check if this is an event for a value pair (array item)
                 # Prefix format: "data.result.item.values.item" for array item
                 # "data.result.item.values.item.item" for nested elements
                 if prefix == "data.result.item.values.item" and event == "start_array":
                     # New value pair started (nested array [timestamp, value])
                     current_value_pair = []
-                    value_pair_index = 0
                 elif prefix == "data.result.item.values.item.item":
                     # This is an event inside a value pair array (timestamp or value)
                     if event == "number":
@@ -660,7 +619,6 @@ class EtlJob:
                         ), "number event must have int, float, or Decimal value"  # noqa: E501  # nosec B101
                         # Convert to float (handles int, float, and Decimal)
                         current_value_pair.append(float(value))
-                        value_pair_index += 1
                     elif event == "string":
                         # Value (index 1) as string - Prometheus may return values
                         # as strings. This happens when value is "NaN", "Inf",
@@ -680,7 +638,6 @@ class EtlJob:
                             # - Inf/-Inf: metric value is infinite
                             #   (e.g., division by zero)
                             current_value_pair.append(float_value)
-                            value_pair_index += 1
                         except (TypeError, ValueError) as exc:
                             # Invalid value (non-numeric string that cannot be parsed).
                             # This is a format error, not a valid Prometheus value.
@@ -715,30 +672,74 @@ class EtlJob:
                             )
                             skipped_count += 1
                             current_value_pair = []
-                            value_pair_index = 0
                 elif prefix == "data.result.item.values.item" and event == "end_array":
                     # Value pair complete - write row immediately
                     if len(current_value_pair) == 2:
                         ts = current_value_pair[0]
                         val = current_value_pair[1]
 
-                        # Write TabSeparated row immediately
+                        # Write RowBinary row immediately
                         # Column order: timestamp, name, labels.key[],
-                        # labels.value[], value
-                        output_f.write(
-                            f"{ts:.6f}\t{metric_name_escaped}\t{labels_keys_str}\t"
-                            f"{labels_values_str}\t{EtlJob._format_float(val)}\n"
+                        # labels.value[], value (middle columns pre-encoded).
+                        # Timestamp is DateTime64(6): Int64 microseconds
+                        write_output(
+                            pack_row(round(ts * 1_000_000), series_columns, val)
                         )
                         rows_count += 1
+                        # current_value_pair is reset by the next pair's
+                        # start_array, no need to allocate a new list here
 
-                        # Clear value pair to free memory immediately
-                        current_value_pair = []
-                        value_pair_index = 0
+                # Track when we exit values array
+                elif prefix == "data.result.item.values" and event == "end_array":
+                    in_values_array = False
+
+            # Track when we enter a new series (data.result.item)
+            elif prefix == "data.result.item" and event == "start_map":
+                # New series started - reset state
+                current_metric = {}
+                current_metric_name = ""
+                current_labels = {}
+                in_values_array = False
+                current_value_pair = []
+                series_count += 1
+
+            # Collect metric object (data.result.item.metric.*)
+            elif prefix.startswith("data.result.item.metric."):
+                if event == "string":
+                    # Extract label key from prefix
+                    # (e.g., "data.result.item.metric.__name__")
+                    label_key = prefix.split(".")[-1]
+                    current_metric[label_key] = str(value)
+
+            # Detect when metric object is complete
+            elif prefix == "data.result.item.metric" and event == "end_map":
+                # Metric object complete - extract metric_name and labels
+                current_metric_name = current_metric.get("__name__", "")
+                current_labels = current_metric.copy()
+                current_labels.pop("__name__", None)
+
+                # Pre-encode series columns once (reused for all points)
+                # Sorted (key, value) pairs are split directly into the two
+                # arrays, without an intermediate dict and list() casts
+                labels_sorted = sorted(current_labels.items())
+                labels_keys = [key for key, _ in labels_sorted]
+                labels_values = [value for _, value in labels_sorted]
+                series_columns = (
+                    self._encode_rowbinary_string(current_metric_name)
+                    + self._encode_rowbinary_string_array(labels_keys)
+                    + self._encode_rowbinary_string_array(labels_values)
+                )
+                pack_row = self._make_row_struct(series_columns).pack
+
+            # Track when we enter values array (data.result.item.values)
+            elif prefix == "data.result.item.values" and event == "start_array":
+                in_values_array = True
+                current_value_pair = []
 
         return rows_count, series_count, skipped_count
 
     def _create_temp_file(
-        self, prefix: str = "etl_batch_", suffix: str = ".tsv"
+        self, prefix: str = "etl_batch_", suffix: str = ".bin"
     ) -> tuple[int, str]:
         """Create temporary file for ETL data.
 
@@ -748,7 +749,7 @@ class EtlJob:
 
         Args:
             prefix: File prefix for explicit naming (default: "etl_batch_")
-            suffix: File suffix/extension (default: ".tsv")
+            suffix: File suffix/extension (default: ".bin")
 
         Returns:
             Tuple of (file_descriptor, file_path) where file_descriptor can be
@@ -760,88 +761,68 @@ class EtlJob:
         return fd, file_path
 
     @staticmethod
-    def _escape_tabseparated_chars(value: str) -> str:
-        """Escape basic TabSeparated characters: backslash, tab, newline.
-
-        According to ClickHouse documentation, TabSeparated format requires
-        escaping of special characters:
-        - Backslash: backslash -> double backslash
-        - Tab: tab character -> escaped tab
-        - Newline: newline character -> escaped newline
+    def _encode_varint(value: int) -> bytes:
+        """Encode non-negative integer as unsigned LEB128 (RowBinary length).
 
         Args:
-            value: String value to escape
+            value: Non-negative integer (string length or array size)
 
         Returns:
-            Escaped string with basic TabSeparated characters escaped
+            Encoded bytes, 7 bits per byte with continuation bit
         """
-        # Escape in order: backslash first, then tab, then newline
-        # This ensures we don't double-escape already escaped sequences
-        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+        encoded = bytearray()
+        while value > 0x7F:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+        return bytes(encoded)
 
     @staticmethod
-    def _format_clickhouse_array(arr: list[str]) -> str:
-        """Format Python list as ClickHouse array string for TabSeparated format.
+    def _encode_rowbinary_string(value: str) -> bytes:
+        """Encode string as RowBinary String: varint length + UTF-8 bytes.
 
-        According to ClickHouse documentation, arrays in TabSeparated format
-        are written as ['a','b'] for strings. String elements must have
-        special characters escaped:
-        - Backslash: backslash -> double backslash
-        - Single quote: single quote -> escaped single quote
-        - Tab: tab character -> escaped tab
-        - Newline: newline character -> escaped newline
+        RowBinary needs no escaping, any characters (tabs, newlines, quotes)
+        are sent as is.
 
         Args:
-            arr: List of strings to format as ClickHouse array
+            value: String value to encode
 
         Returns:
-            Formatted array string (e.g., "['a','b']" or "[]" for empty array)
+            Encoded bytes
         """
-        if not arr:
-            return "[]"
-
-        # Escape each element: basic TabSeparated chars, then single quote
-        escaped = []
-        for elem in arr:
-            elem_escaped = EtlJob._escape_tabseparated_chars(elem).replace("'", "\\'")
-            escaped.append(f"'{elem_escaped}'")
-        return "[" + ",".join(escaped) + "]"
+        data = value.encode("utf-8")
+        return EtlJob._encode_varint(len(data)) + data
 
     @staticmethod
-    def _format_float(value: float) -> str:
-        """Format float without scientific notation.
+    def _encode_rowbinary_string_array(arr: list[str]) -> bytes:
+        """Encode list as RowBinary Array(String): varint size + elements.
 
-        Formats float value ensuring no scientific notation is used.
-        Handles special values (NaN, Inf, -Inf) correctly for ClickHouse.
-        Uses general format first, falls back to fixed format if scientific
-        notation would be used.
+        Args:
+            arr: List of strings to encode
+
+        Returns:
+            Encoded bytes (single zero byte for empty array)
+        """
+        return EtlJob._encode_varint(len(arr)) + b"".join(
+            EtlJob._encode_rowbinary_string(elem) for elem in arr
+        )
+
+    @staticmethod
+    def _make_row_struct(series_columns: bytes) -> struct.Struct:
+        """Build RowBinary row layout for one series.
 
-        Scientific notation (e.g., "1.23e-4") is avoided because ClickHouse
-        TabSeparated format parser may not correctly parse scientific notation
-        in all cases, especially for very small or very large numbers. Using
-        fixed-point notation ensures reliable parsing and data integrity.
+        Row is Int64 timestamp (microseconds), pre-encoded series columns and
+        Float64 value, little-endian without padding. Packing whole row with
+        one precompiled Struct avoids per-point concatenation. Float64 is
+        written as is, so NaN and Inf are preserved exactly.
 
         Args:
-            value: Float value to format (may be NaN, Inf, or -Inf)
+            series_columns: Pre-encoded name, labels.key and labels.value
 
         Returns:
-            Formatted string without scientific notation. Special values are
-            formatted as "nan", "inf", "-inf" (ClickHouse-compatible format).
+            Compiled struct for packing (timestamp, series_columns, value)
         """
-        # Handle special float values (NaN, Inf, -Inf)
-        # ClickHouse expects these as lowercase strings in TabSeparated format
-        if math.isnan(value):
-            return "nan"
-        if math.isinf(value):
-            return "inf" if value > 0 else "-inf"
-
-        # Try general format first (handles most cases efficiently)
-        formatted = f"{value:.15g}"
-        if "e" in formatted.lower():
-            # If scientific notation was used, use fixed format
-            # Remove trailing zeros and decimal point if not needed
-            formatted = f"{value:.15f}".rstrip("0").rstrip(".")
-        return formatted
+        return struct.Struct(f"<q{len(series_columns)}sd")
 
     @staticmethod
     def _cleanup_temp_file(file_path: str) -> None:
@@ -61,12 +61,15 @@ def main() -> None:
         prom_client = PrometheusClient(config.prometheus)
         ch_client = ClickHouseClient(config.clickhouse)
 
-        job = EtlJob(
-            config=config,
-            prometheus_client=prom_client,
-            clickhouse_client=ch_client,
-        )
-        job.run_once()
+        try:
+            job = EtlJob(
+                config=config,
+                prometheus_client=prom_client,
+                clickhouse_client=ch_client,
+            )
+            job.run_once()
+        finally:
+            ch_client.close()
     except Exception as exc:
         error_msg = f"Application error occurred: {type(exc).__name__}: {exc}"
         logger.error(
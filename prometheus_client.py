@@ -15,6 +15,11 @@ from logging_config import getLogger
 
 logger = getLogger(__name__)
 
+# Read size for streaming response body to file. Large chunks keep the
+# per-chunk Python loop and write() calls negligible for big responses
+# while memory stays bounded to one chunk.
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class PrometheusClient:
     """Client for interacting with Prometheus-compatible HTTP API.
@@ -66,7 +71,8 @@ class PrometheusClient:
                 (e.g., step, window_seconds)
 
         Returns:
-            HTTP response object
+            HTTP response object with unread (streamed) body. Caller is
+            responsible for closing it.
 
         Raises:
             requests.Timeout: If request times out
@@ -77,12 +83,15 @@ class PrometheusClient:
             extra_log_fields = {}
 
         try:
+            # stream=True defers body download until iter_content() is called,
+            # so large responses are never buffered in memory as a whole
             response = requests.get(
                 url,
                 params=params,
                 timeout=self._timeout,
                 auth=self._auth,
                 verify=self._verify,
+                stream=True,
             )
         except requests.Timeout as exc:
             log_extra = {
@@ -139,7 +148,7 @@ class PrometheusClient:
             file_path: Path to file where response will be saved
 
         Raises:
-            requests.RequestException: If HTTP request fails
+            requests.RequestException: If HTTP request or body download fails
             OSError: If file write fails
         """
         url = f"{self._base_url}/api/v1/query_range"
@@ -162,48 +171,75 @@ class PrometheusClient:
             },
         )
 
-        # Validate HTTP status before streaming
         try:
-            response.raise_for_status()
-        except requests.RequestException as exc:
-            # Try to get response body for better error diagnostics
-            response_text = None
-            try:  # pragma: no cover
-                response_text = response.text[:1000]  # pragma: no cover
-            except Exception:  # nosec B110  # pragma: no cover
-                # Response body may not be readable in all error scenarios
-                # This is intentional defensive code
-                pass  # pragma: no cover
-
-            logger.error(
-                "Prometheus query failed",
-                extra={
-                    "prometheus_client.query_failed.error": str(exc),
-                    "prometheus_client.query_failed.error_type": type(exc).__name__,
-                    "prometheus_client.query_failed.expression": expr,
-                    "prometheus_client.query_failed.url": response.url,
-                    "prometheus_client.query_failed.status_code": response.status_code,
-                    "prometheus_client.query_failed.response_preview": response_text,
-                },
-            )
-            raise
-
-        # Stream response body directly to file
-        try:
-            with open(file_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:  # pragma: no branch
-                        # iter_content may yield empty chunks, skip them
-                        f.write(chunk)
-        except OSError as exc:
-            logger.error(
-                "Failed to write Prometheus response to file",
-                extra={
-                    "prometheus_client.query_range_to_file_failed.error": str(exc),
-                    "prometheus_client.query_range_to_file_failed.file_name": (
-                        os.path.basename(file_path)
-                    ),
-                    "prometheus_client.query_range_to_file_failed.expression": expr,
-                },
-            )
-            raise
+            # Validate HTTP status before streaming
+            try:
+                response.raise_for_status()
+            except requests.RequestException as exc:
+                # Try to get response body for better error diagnostics
+                response_text = None
+                try:  # pragma: no cover
+                    response_text = response.text[:1000]  # pragma: no cover
+                except Exception:  # nosec B110  # pragma: no cover
+                    # Response body may not be readable in all error scenarios
+                    # This is intentional defensive code
+                    pass  # pragma: no cover
+
+                logger.error(
+                    "Prometheus query failed",
+                    extra={
+                        "prometheus_client.query_failed.error": str(exc),
+                        "prometheus_client.query_failed.error_type": type(exc).__name__,
+                        "prometheus_client.query_failed.expression": expr,
+                        "prometheus_client.query_failed.url": response.url,
+                        "prometheus_client.query_failed.status_code": (
+                            response.status_code
+                        ),
+                        "prometheus_client.query_failed.response_preview": (
+                            response_text
+                        ),
+                    },
+                )
+                raise
+
+            # Stream response body directly to file
+            try:
+                with open(file_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                        if chunk:  # pragma: no branch
+                            # iter_content may yield empty chunks, skip them
+                            f.write(chunk)
+            except requests.RequestException as exc:
+                # With stream=True the body is downloaded here, so read
+                # timeouts and connection resets surface from iter_content().
+                # RequestException subclasses OSError, so it must be handled
+                # before the file write errors below.
+                logger.error(
+                    "Prometheus query_range request failed",
+                    extra={
+                        "prometheus_client.query_range_request_failed.error": str(exc),
+                        "prometheus_client.query_range_request_failed.error_type": (
+                            type(exc).__name__
+                        ),
+                        "prometheus_client.query_range_request_failed.expression": (
+                            expr
+                        ),
+                        "prometheus_client.query_range_request_failed.url": url,
+                    },
+                )
+                raise
+            except OSError as exc:
+                logger.error(
+                    "Failed to write Prometheus response to file",
+                    extra={
+                        "prometheus_client.query_range_to_file_failed.error": str(exc),
+                        "prometheus_client.query_range_to_file_failed.file_name": (
+                            os.path.basename(file_path)
+                        ),
+                        "prometheus_client.query_range_to_file_failed.expression": expr,
+                    },
+                )
+                raise
+        finally:
+            # Release the connection back to the pool (body is streamed)
+            response.close()
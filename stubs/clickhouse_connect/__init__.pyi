@@ -8,25 +8,45 @@ subset of the API used by this codebase.
 
 from __future__ import annotations
 
-from typing import Any, Protocol, Sequence
+from collections.abc import Iterable
+from typing import Any, BinaryIO, Protocol, Sequence
 
 class QueryResult(Protocol):
     """Result returned by client.query()."""
 
     result_rows: Sequence[Sequence[Any]]
 
+class QuerySummary(Protocol):
+    """Summary returned by client.command() for statements without result."""
+
+    written_rows: int
+
 class Client(Protocol):
     """Minimal client surface used by this project."""
 
     def query(self, query: str, **kwargs: Any) -> QueryResult: ...
+    def command(self, cmd: str, **kwargs: Any) -> QuerySummary: ...
     def insert(
         self,
         table: str,
         data: Sequence[Sequence[Any]],
         *,
         column_names: Sequence[str] | None = ...,
+        column_type_names: Sequence[str] | None = ...,
+        settings: dict[str, Any] | None = ...,
         **kwargs: Any,
     ) -> None: ...
+    def raw_insert(
+        self,
+        table: str | None = ...,
+        column_names: Sequence[str] | None = ...,
+        insert_block: str | bytes | Iterable[bytes] | BinaryIO | None = ...,
+        settings: dict[str, Any] | None = ...,
+        fmt: str | None = ...,
+        compression: str | None = ...,
+        transport_settings: dict[str, str] | None = ...,
+    ) -> QuerySummary: ...
+    def close(self) -> None: ...
 
 def get_client(
     *,
@@ -38,5 +58,6 @@ def get_client(
     connect_timeout: int | None = ...,
     send_receive_timeout: int | None = ...,
     verify: bool | str = ...,
+    compress: bool | str = ...,
     **kwargs: Any,
 ) -> Client: ...
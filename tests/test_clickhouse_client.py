@@ -2,13 +2,36 @@
 Comprehensive tests for ClickHouseClient.
 """
 
-from datetime import datetime, timezone
+import io
 from unittest.mock import Mock, patch
 
 import pytest
+import zstandard
 
-from clickhouse_client import ClickHouseClient
+from clickhouse_client import ClickHouseClient, _OneShotBody
 from config import ClickHouseConfig
+from etl_job import EtlJob
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    """Decompress zstd stream written without content size in frame header."""
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def _make_rowbinary_row() -> bytes:
+    """Encode one RowBinary row for metric "up" without labels.
+
+    Uses EtlJob encoders, so fixture rows follow the layout of real files:
+    timestamp (Int64), name, labels.key[], labels.value[], value (Float64).
+    """
+    series_columns = (
+        EtlJob._encode_rowbinary_string("up")
+        + EtlJob._encode_rowbinary_string_array([])
+        + EtlJob._encode_rowbinary_string_array([])
+    )
+    return EtlJob._make_row_struct(series_columns).pack(
+        1234567890000000, series_columns, 1.0
+    )
 
 
 def _make_clickhouse_config(**kwargs: object) -> ClickHouseConfig:
@@ -50,6 +73,7 @@ def test_clickhouse_client_init(mock_get_client: Mock) -> None:
         verify=True,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
     )
 
 
@@ -70,6 +94,7 @@ def test_clickhouse_client_init_with_auth(mock_get_client: Mock) -> None:
         verify=True,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
     )
 
 
@@ -90,6 +115,7 @@ def test_clickhouse_client_init_with_empty_password(mock_get_client: Mock) -> No
         verify=True,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
     )
 
 
@@ -113,6 +139,7 @@ def test_clickhouse_client_init_with_user_but_no_password(
         verify=True,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
     )
 
 
@@ -133,6 +160,7 @@ def test_clickhouse_client_init_with_custom_timeouts(mock_get_client: Mock) -> N
         verify=True,
         connect_timeout=5,
         send_receive_timeout=60,
+        compress=True,
     )
 
 
@@ -153,6 +181,28 @@ def test_clickhouse_client_init_with_insecure(mock_get_client: Mock) -> None:
         verify=False,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
+    )
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_init_with_compress_disabled(mock_get_client: Mock) -> None:
+    """Client should disable clickhouse-connect compression when compress=False."""
+    mock_client = Mock()
+    mock_get_client.return_value = mock_client
+
+    cfg = _make_clickhouse_config(compress=False)
+    _ = ClickHouseClient(cfg)
+    mock_get_client.assert_called_once_with(
+        host="ch",
+        port=8123,
+        username=None,
+        password=None,
+        secure=False,
+        verify=True,
+        connect_timeout=10,
+        send_receive_timeout=300,
+        compress=False,
     )
 
 
@@ -173,6 +223,7 @@ def test_clickhouse_client_init_with_https_url(mock_get_client: Mock) -> None:
         verify=True,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
     )
 
 
@@ -195,16 +246,61 @@ def test_clickhouse_client_init_with_https_url_no_port(
         verify=True,
         connect_timeout=10,
         send_receive_timeout=300,
+        compress=True,
     )
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_init_with_invalid_url_missing_hostname(
+def test_clickhouse_client_init_invalid_table_metrics(mock_get_client: Mock) -> None:
+    """Client should reject invalid table_metrics before connecting."""
+    cfg = _make_clickhouse_config(table_metrics="invalid-table-name!")
+    with pytest.raises(ValueError, match="Invalid table_metrics format"):
+        ClickHouseClient(cfg)
+
+    mock_get_client.assert_not_called()
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_init_empty_table_metrics(mock_get_client: Mock) -> None:
+    """Client should reject empty table_metrics."""
+    cfg = _make_clickhouse_config(table_metrics="")
+    with pytest.raises(ValueError, match="table name cannot be empty"):
+        ClickHouseClient(cfg)
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_init_invalid_table_etl(mock_get_client: Mock) -> None:
+    """Client should reject invalid table_etl before connecting."""
+    cfg = _make_clickhouse_config(table_etl="invalid-table-name!")
+    with pytest.raises(ValueError, match="Invalid table_etl format"):
+        ClickHouseClient(cfg)
+
+    mock_get_client.assert_not_called()
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_init_empty_table_etl(mock_get_client: Mock) -> None:
+    """Client should reject empty table_etl."""
+    cfg = _make_clickhouse_config(table_etl="")
+    with pytest.raises(ValueError, match="table name cannot be empty"):
+        ClickHouseClient(cfg)
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_init_table_name_too_many_dots(
     mock_get_client: Mock,
 ) -> None:
-    """Client should raise ValueError for invalid URL."""
-    cfg = _make_clickhouse_config(url="http://")
-    with pytest.raises(ValueError, match="Invalid URL: missing hostname"):
+    """Client should reject table name with too many dots."""
+    cfg = _make_clickhouse_config(table_etl="db.table.extra")
+    with pytest.raises(ValueError, match="too many dots"):
+        ClickHouseClient(cfg)
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_init_table_name_empty_part(mock_get_client: Mock) -> None:
+    """Client should reject table name with empty part."""
+    cfg = _make_clickhouse_config(table_metrics=".table")
+    with pytest.raises(ValueError, match="empty part"):
         ClickHouseClient(cfg)
 
 
@@ -237,116 +333,133 @@ def test_clickhouse_client_init_connection_error_logs_details(
     assert "Connection failed" in call_args[0][0]
 
 
-@patch("clickhouse_client.requests.post")
 @patch("clickhouse_client.clickhouse_connect.get_client")
 def test_clickhouse_client_insert_from_file_success(
-    mock_get_client: Mock, mock_requests_post: Mock, tmp_path
+    mock_get_client: Mock, tmp_path
 ) -> None:
     """insert_from_file() should insert data via HTTP streaming."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
+    sent_bodies: list[bytes] = []
 
-    mock_response = Mock()
-    mock_response.raise_for_status = Mock()
-    mock_requests_post.return_value = mock_response
+    def _consume_body(*args: object, **kwargs: object) -> Mock:
+        # Body generator reads the open file, so consume it during the call
+        sent_bodies.append(b"".join(kwargs["insert_block"]))  # type: ignore[arg-type]
+        return Mock()
 
-    cfg = _make_clickhouse_config()
+    mock_client.raw_insert.side_effect = _consume_body
+
+    cfg = _make_clickhouse_config(user="user", password="pass")
     client = ClickHouseClient(cfg)
 
-    # Create test file in TabSeparated format
-    # TabSeparated format: timestamp\tname\tlabels.key[]\tlabels.value[]\tvalue
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n1234567900\tup\t[]\t[]\t1.0\n")
+    # Create test file in RowBinary format
+    file_path = tmp_path / "test.bin"
+    row = _make_rowbinary_row()
+    content = row * 2
+    file_path.write_bytes(content)
 
     client.insert_from_file(str(file_path))
 
-    # Verify HTTP POST was called with correct parameters
-    mock_requests_post.assert_called_once()
-    call_args = mock_requests_post.call_args
-    assert call_args[0][0] == "http://ch:8123"
-    assert call_args[1]["params"]["query"] == "INSERT INTO db.tbl FORMAT TabSeparated"
-    assert "data" in call_args[1]
-    mock_response.raise_for_status.assert_called_once()
+    # Verify streaming insert went through the clickhouse-connect client
+    mock_client.raw_insert.assert_called_once()
+    call_args = mock_client.raw_insert.call_args
+    assert call_args[0][0] == "db.tbl"
+    assert call_args[1]["fmt"] == "RowBinary"
+    # Compression is enabled by default: body is zstd stream of file contents
+    assert call_args[1]["compression"] == "zstd"
+    assert _zstd_decompress(sent_bodies[0]) == content
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_insert_from_file_invalid_table_name(
+def test_clickhouse_client_insert_from_file_without_compression(
     mock_get_client: Mock, tmp_path
 ) -> None:
-    """insert_from_file() should raise ValueError for invalid table name."""
+    """insert_from_file() should stream file as-is when compression is disabled."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
+    sent_bodies: list[bytes] = []
 
-    cfg = _make_clickhouse_config(table_metrics="invalid-table-name!")
+    def _consume_body(*args: object, **kwargs: object) -> Mock:
+        # Body generator reads the open file, so consume it during the call
+        sent_bodies.append(b"".join(kwargs["insert_block"]))  # type: ignore[arg-type]
+        return Mock()
+
+    mock_client.raw_insert.side_effect = _consume_body
+
+    cfg = _make_clickhouse_config(compress=False)
     client = ClickHouseClient(cfg)
 
-    # Create test file (content doesn't matter for validation test)
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n")
+    file_path = tmp_path / "test.bin"
+    file_path.write_bytes(_make_rowbinary_row())
 
-    with pytest.raises(ValueError, match="Invalid table_metrics format"):
-        client.insert_from_file(str(file_path))
+    client.insert_from_file(str(file_path))
 
-    # Verify that HTTP POST was not called due to validation error
-    # requests.post is not imported at module level, so we can't easily mock it
-    # But validation happens before HTTP request, so this is fine
+    call_args = mock_client.raw_insert.call_args
+    assert call_args[1]["compression"] is None
+    assert sent_bodies[0] == file_path.read_bytes()
 
 
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_insert_from_file_empty_table_name(
-    mock_get_client: Mock, tmp_path
-) -> None:
-    """insert_from_file() should raise ValueError for empty table name."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
+def test_clickhouse_client_iter_file_chunks() -> None:
+    """_iter_file_chunks() should read file in chunks of given size."""
+    data = b"x" * (2 * 1024 + 10)
 
-    cfg = _make_clickhouse_config(table_metrics="")
-    client = ClickHouseClient(cfg)
+    chunks = list(ClickHouseClient._iter_file_chunks(io.BytesIO(data), 1024))
 
-    # Create test file (content doesn't matter for validation test)
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n")
+    assert [len(chunk) for chunk in chunks] == [1024, 1024, 10]
+    assert b"".join(chunks) == data
 
-    with pytest.raises(ValueError, match="table name cannot be empty"):
-        client.insert_from_file(str(file_path))
+
+def test_clickhouse_client_iter_zstd_chunks_multiple_blocks() -> None:
+    """_iter_zstd_chunks() should produce valid zstd stream for multi-block input."""
+    # Highly compressible data spanning several read blocks: compressor
+    # buffers most blocks internally, and empty outputs must not be yielded
+    data = _make_rowbinary_row() * 300_000
+
+    chunks = list(ClickHouseClient._iter_zstd_chunks(io.BytesIO(data), 1024 * 1024))
+
+    assert all(chunks)
+    assert _zstd_decompress(b"".join(chunks)) == data
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_insert_from_file_too_many_dots(
-    mock_get_client: Mock, tmp_path
+@patch("clickhouse_client.logger")
+def test_clickhouse_client_insert_from_file_refuses_body_replay(
+    mock_logger: Mock, mock_get_client: Mock, tmp_path
 ) -> None:
-    """insert_from_file() should raise ValueError for table name with too many dots."""
+    """insert_from_file() should fail instead of resending a partly sent body."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    cfg = _make_clickhouse_config(table_metrics="db.table.extra")
+    def _reset_and_retry(*args: object, **kwargs: object) -> Mock:
+        # Mimic clickhouse-connect retry after ConnectionResetError: first
+        # attempt takes one chunk, second attempt iterates the same body
+        body = kwargs["insert_block"]
+        next(iter(body))  # type: ignore[call-overload]
+        b"".join(body)  # type: ignore[arg-type]
+        return Mock()  # pragma: no cover
+
+    mock_client.raw_insert.side_effect = _reset_and_retry
+
+    cfg = _make_clickhouse_config(compress=False, insert_chunk_size=1024)
     client = ClickHouseClient(cfg)
 
-    # Create test file (content doesn't matter for validation test)
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n")
+    file_path = tmp_path / "test.bin"
+    file_path.write_bytes(_make_rowbinary_row() * 100)
 
-    with pytest.raises(ValueError, match="too many dots"):
+    with pytest.raises(RuntimeError, match="cannot be replayed"):
         client.insert_from_file(str(file_path))
 
+    mock_logger.error.assert_called_once()
+    assert "RuntimeError" in mock_logger.error.call_args[0][0]
 
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_insert_from_file_empty_part(
-    mock_get_client: Mock, tmp_path
-) -> None:
-    """insert_from_file() should raise ValueError for table name with empty part."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
 
-    cfg = _make_clickhouse_config(table_metrics=".table")
-    client = ClickHouseClient(cfg)
+def test_clickhouse_client_one_shot_body_allows_replay_before_read() -> None:
+    """_OneShotBody should allow re-iteration while no chunk was taken yet."""
+    body = _OneShotBody(iter([b"a", b"b"]))
 
-    # Create test file (content doesn't matter for validation test)
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n")
+    iter(body)
 
-    with pytest.raises(ValueError, match="empty part"):
-        client.insert_from_file(str(file_path))
+    assert b"".join(body) == b"ab"
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -361,7 +474,7 @@ def test_clickhouse_client_insert_from_file_not_found(
     client = ClickHouseClient(cfg)
 
     with pytest.raises(FileNotFoundError):
-        client.insert_from_file(str(tmp_path / "nonexistent.tsv"))
+        client.insert_from_file(str(tmp_path / "nonexistent.bin"))
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -376,54 +489,51 @@ def test_clickhouse_client_insert_from_file_empty_file(
     client = ClickHouseClient(cfg)
 
     # Create empty file
-    file_path = tmp_path / "empty.tsv"
+    file_path = tmp_path / "empty.bin"
     file_path.touch()
 
     client.insert_from_file(str(file_path))
 
     # Empty file should not call HTTP POST to avoid unnecessary request
-    # requests.post is not imported at module level, so we can't easily mock it
-    # But empty file check happens before HTTP request, so this is fine
+    mock_client.raw_insert.assert_not_called()
 
 
-@patch("clickhouse_client.requests.post")
 @patch("clickhouse_client.clickhouse_connect.get_client")
 def test_clickhouse_client_insert_from_file_insert_error(
-    mock_get_client: Mock, mock_requests_post: Mock, tmp_path
+    mock_get_client: Mock, tmp_path
 ) -> None:
     """insert_from_file() should raise exception on HTTP POST failure."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    mock_requests_post.side_effect = Exception("HTTP request failed")
+    mock_client.raw_insert.side_effect = Exception("HTTP request failed")
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
 
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n")
+    file_path = tmp_path / "test.bin"
+    file_path.write_bytes(_make_rowbinary_row())
 
     with pytest.raises(Exception, match="HTTP request failed"):
         client.insert_from_file(str(file_path))
 
 
-@patch("clickhouse_client.requests.post")
 @patch("clickhouse_client.clickhouse_connect.get_client")
 @patch("clickhouse_client.logger")
 def test_clickhouse_client_insert_from_file_insert_error_logs_details(
-    mock_logger: Mock, mock_get_client: Mock, mock_requests_post: Mock, tmp_path
+    mock_logger: Mock, mock_get_client: Mock, tmp_path
 ) -> None:
     """insert_from_file() should log error details on HTTP POST failure."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    mock_requests_post.side_effect = Exception("HTTP request failed")
+    mock_client.raw_insert.side_effect = Exception("HTTP request failed")
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
 
-    file_path = tmp_path / "test.tsv"
-    file_path.write_text("1234567890\tup\t[]\t[]\t1.0\n")
+    file_path = tmp_path / "test.bin"
+    file_path.write_bytes(_make_rowbinary_row())
 
     with pytest.raises(Exception):
         client.insert_from_file(str(file_path))
@@ -438,6 +548,16 @@ def test_clickhouse_client_insert_from_file_insert_error_logs_details(
     assert any("HTTP request failed" in msg for msg in error_messages)
 
 
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_close(mock_get_client: Mock) -> None:
+    """close() should close the clickhouse-connect client and its pool."""
+    client = ClickHouseClient(_make_clickhouse_config())
+
+    client.close()
+
+    mock_get_client.return_value.close.assert_called_once()
+
+
 @patch("clickhouse_client.clickhouse_connect.get_client")
 def test_clickhouse_client_get_state_success(mock_get_client: Mock) -> None:
     """get_state() should return state from ClickHouse."""
@@ -463,6 +583,12 @@ def test_clickhouse_client_get_state_success(mock_get_client: Mock) -> None:
         "batch_skipped_count": 5,
     }
     mock_client.query.assert_called_once()
+    query = mock_client.query.call_args[0][0]
+    # Completed run rows are final as written, no merge on read
+    assert "FINAL" not in query
+    assert "ORDER BY timestamp_start DESC" in query
+    assert "toUnixTimestamp(timestamp_progress)" in query
+    assert "LIMIT 1" in query
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -552,70 +678,6 @@ def test_clickhouse_client_get_state_query_error_logs_details(
     assert any("Failed to read state from ClickHouse" in msg for msg in error_messages)
 
 
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_invalid_table_name(mock_get_client: Mock) -> None:
-    """get_state() should raise ValueError for invalid table name."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl="invalid-table-name!")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="Invalid table_etl format"):
-        client.get_state()
-
-    # Verify that query was not called due to validation error
-    mock_client.query.assert_not_called()
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_empty_table_name(mock_get_client: Mock) -> None:
-    """get_state() should raise ValueError for empty table name."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl="")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="table name cannot be empty"):
-        client.get_state()
-
-    # Verify that query was not called due to validation error
-    mock_client.query.assert_not_called()
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_too_many_dots(mock_get_client: Mock) -> None:
-    """get_state() should raise ValueError for table name with too many dots."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl="db.table.extra")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="too many dots"):
-        client.get_state()
-
-    # Verify that query was not called due to validation error
-    mock_client.query.assert_not_called()
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_empty_part(mock_get_client: Mock) -> None:
-    """get_state() should raise ValueError for table name with empty part."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl=".table")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="empty part"):
-        client.get_state()
-
-    # Verify that query was not called due to validation error
-    mock_client.query.assert_not_called()
-
-
 @patch("clickhouse_client.clickhouse_connect.get_client")
 def test_clickhouse_client_save_state_success(mock_get_client: Mock) -> None:
     """save_state() should insert state using INSERT."""
@@ -637,14 +699,14 @@ def test_clickhouse_client_save_state_success(mock_get_client: Mock) -> None:
     # Always uses INSERT (ReplacingMergeTree handles deduplication)
     # Fields saved in table order:
     # timestamp_start, timestamp_end, timestamp_progress, ...
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "default.etl",
         [
             [
-                datetime.fromtimestamp(1700000100, tz=timezone.utc),
-                datetime.fromtimestamp(1700000200, tz=timezone.utc),
-                datetime.fromtimestamp(1700000000, tz=timezone.utc),
+                1700000100,
+                1700000200,
+                1700000000,
                 300,
                 100,
                 5,
@@ -658,6 +720,15 @@ def test_clickhouse_client_save_state_success(mock_get_client: Mock) -> None:
             "batch_rows",
             "batch_skipped_count",
         ],
+        column_type_names=[
+            "DateTime",
+            "Nullable(DateTime)",
+            "Nullable(DateTime)",
+            "Nullable(Int64)",
+            "Nullable(Int64)",
+            "Nullable(Int64)",
+        ],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
@@ -678,19 +749,63 @@ def test_clickhouse_client_save_state_partial(mock_get_client: Mock) -> None:
     # Always uses INSERT with only provided fields
     # Fields saved in table order:
     # timestamp_start, timestamp_end, timestamp_progress, ...
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "default.etl",
         [
             [
-                datetime.fromtimestamp(1700000100, tz=timezone.utc),
-                datetime.fromtimestamp(1700000000, tz=timezone.utc),
+                1700000100,
+                1700000000,
             ]
         ],
         column_names=["timestamp_start", "timestamp_progress"],
+        column_type_names=["DateTime", "Nullable(DateTime)"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_save_state_reuses_column_names(
+    mock_get_client: Mock,
+) -> None:
+    """save_state() should reuse column name list for same set of fields."""
+    mock_client = Mock()
+    mock_get_client.return_value = mock_client
+
+    cfg = _make_clickhouse_config()
+    client = ClickHouseClient(cfg)
+
+    client.save_state(timestamp_start=1700000000)
+    client.save_state(timestamp_start=1700000100)
+    client.save_state(timestamp_start=1700000200, batch_rows=10)
+
+    calls = mock_client.insert.call_args_list
+    assert calls[0].kwargs["column_names"] == ["timestamp_start"]
+    assert calls[1].kwargs["column_names"] is calls[0].kwargs["column_names"]
+    assert calls[2].kwargs["column_names"] == ["timestamp_start", "batch_rows"]
+    assert calls[2].kwargs["column_type_names"] == ["DateTime", "Nullable(Int64)"]
+    assert calls[1][0][1] == [[1700000100]]
+
+
+@patch("clickhouse_client.clickhouse_connect.get_client")
+def test_clickhouse_client_save_state_uses_async_insert(
+    mock_get_client: Mock,
+) -> None:
+    """save_state() should use server-side async insert and wait for flush."""
+    mock_client = Mock()
+    mock_get_client.return_value = mock_client
+
+    cfg = _make_clickhouse_config()
+    client = ClickHouseClient(cfg)
+
+    client.save_state(timestamp_start=1700000000)
+
+    assert mock_client.insert.call_args.kwargs["settings"] == {
+        "async_insert": 1,
+        "wait_for_async_insert": 1,
+    }
+
+
 @patch("clickhouse_client.clickhouse_connect.get_client")
 def test_clickhouse_client_save_state_empty(mock_get_client: Mock) -> None:
     """save_state() should not insert when no fields provided."""
@@ -722,16 +837,18 @@ def test_clickhouse_client_save_state_insert_new_record(mock_get_client: Mock) -
     # When timestamp_start is not provided, should use INSERT
     # Fields saved in table order:
     # timestamp_start, timestamp_end, timestamp_progress, ...
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "default.etl",
         [
             [
-                datetime.fromtimestamp(1700000200, tz=timezone.utc),
-                datetime.fromtimestamp(1700000000, tz=timezone.utc),
+                1700000200,
+                1700000000,
             ]
         ],
         column_names=["timestamp_end", "timestamp_progress"],
+        column_type_names=["Nullable(DateTime)", "Nullable(DateTime)"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
@@ -783,11 +900,13 @@ def test_clickhouse_client_save_state_custom_table(mock_get_client: Mock) -> Non
 
     client.save_state(timestamp_progress=1700000000)
 
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "custom.state_table",
-        [[datetime.fromtimestamp(1700000000, tz=timezone.utc)]],
+        [[1700000000]],
         column_names=["timestamp_progress"],
+        column_type_names=["Nullable(DateTime)"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
@@ -805,11 +924,13 @@ def test_clickhouse_client_save_state_update_no_other_fields(
     client.save_state(timestamp_start=1700000100)
 
     # Always uses INSERT
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "default.etl",
-        [[datetime.fromtimestamp(1700000100, tz=timezone.utc)]],
+        [[1700000100]],
         column_names=["timestamp_start"],
+        column_type_names=["DateTime"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
@@ -830,82 +951,21 @@ def test_clickhouse_client_save_state_update_with_end_only(
     )
 
     # Always uses INSERT with only provided fields
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "default.etl",
         [
             [
-                datetime.fromtimestamp(1700000100, tz=timezone.utc),
-                datetime.fromtimestamp(1700000200, tz=timezone.utc),
+                1700000100,
+                1700000200,
             ]
         ],
         column_names=["timestamp_start", "timestamp_end"],
+        column_type_names=["DateTime", "Nullable(DateTime)"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_save_state_update_invalid_table_name(
-    mock_get_client: Mock,
-) -> None:
-    """save_state() should raise ValueError for invalid table name."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl="invalid-table-name!")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="Invalid table_etl format"):
-        client.save_state(
-            timestamp_start=1700000100,
-            timestamp_progress=1700000000,
-        )
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_save_state_empty_table_name(
-    mock_get_client: Mock,
-) -> None:
-    """save_state() should raise ValueError for empty table name."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl="")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="table name cannot be empty"):
-        client.save_state(timestamp_start=1700000100)
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_save_state_too_many_dots(
-    mock_get_client: Mock,
-) -> None:
-    """save_state() should raise ValueError for table name with too many dots."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl="db.table.extra")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="too many dots"):
-        client.save_state(timestamp_start=1700000100)
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_save_state_empty_part(
-    mock_get_client: Mock,
-) -> None:
-    """save_state() should raise ValueError for table name with empty part."""
-    mock_client = Mock()
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config(table_etl=".table")
-    client = ClickHouseClient(cfg)
-
-    with pytest.raises(ValueError, match="empty part"):
-        client.save_state(timestamp_start=1700000100)
-
-
 @patch("clickhouse_client.clickhouse_connect.get_client")
 def test_clickhouse_client_save_state_insert_with_start_only(
     mock_get_client: Mock,
@@ -919,11 +979,13 @@ def test_clickhouse_client_save_state_insert_with_start_only(
 
     client.save_state(timestamp_start=1700000100)
 
-    # Timestamps are converted to datetime objects before insert
+    # Timestamps are sent as Unix seconds (DateTime column type hints)
     mock_client.insert.assert_called_once_with(
         "default.etl",
-        [[datetime.fromtimestamp(1700000100, tz=timezone.utc)]],
+        [[1700000100]],
         column_names=["timestamp_start"],
+        column_type_names=["DateTime"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
@@ -948,6 +1010,8 @@ def test_clickhouse_client_save_state_insert_with_batch_fields(
         "default.etl",
         [[300, 100, 5]],
         column_names=["batch_window_seconds", "batch_rows", "batch_skipped_count"],
+        column_type_names=["Nullable(Int64)", "Nullable(Int64)", "Nullable(Int64)"],
+        settings=ClickHouseClient._STATE_INSERT_SETTINGS,
     )
 
 
@@ -974,7 +1038,7 @@ def test_clickhouse_client_has_running_job_when_running_exists(
     # Verify query checks for running job
     query_call = mock_client.query.call_args[0][0]
     assert "timestamp_start IS NOT NULL" in query_call
-    assert "timestamp_end IS NULL" in query_call
+    assert "max(timestamp_end) IS NULL" in query_call
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -1020,7 +1084,7 @@ def test_clickhouse_client_has_running_job_handles_query_error(
 def test_clickhouse_client_get_running_job_timestamps_without_final(
     mock_get_client: Mock,
 ) -> None:
-    """_get_running_job_timestamps() should work with use_final=False."""
+    """_get_running_job_timestamps() should group raw records instead of FINAL."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
@@ -1032,15 +1096,17 @@ def test_clickhouse_client_get_running_job_timestamps_without_final(
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
 
-    result = client._get_running_job_timestamps(use_final=False)
+    result = client._get_running_job_timestamps()
 
     assert result == [1700000100]
     mock_client.query.assert_called_once()
-    # Verify query does NOT use FINAL when use_final=False
+    # Open + closed unmerged records are resolved by grouping, not FINAL
     query_call = mock_client.query.call_args[0][0]
     assert "FINAL" not in query_call
     assert "timestamp_start IS NOT NULL" in query_call
-    assert "timestamp_end IS NULL" in query_call
+    assert "SELECT toUnixTimestamp(timestamp_start)" in query_call
+    assert "GROUP BY timestamp_start" in query_call
+    assert "HAVING max(timestamp_end) IS NULL" in query_call
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -1049,24 +1115,14 @@ def test_clickhouse_client_try_mark_start_success(mock_get_client: Mock) -> None
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    # First query (check running count) returns 0 (no running jobs)
-    # Second query (INSERT) succeeds
-    # Third query (verify our record exists) returns our timestamp_start
-    # Fourth query (check running jobs) returns our timestamp_start as only running job
-    mock_result_running_count = Mock()
-    mock_result_running_count.result_rows = [[0]]  # No running jobs
-    mock_result_verify = Mock()
-    mock_result_verify.result_rows = [[1700000100]]  # Our timestamp_start
+    # Conditional INSERT writes our record (written_rows=1),
+    # check running jobs returns our timestamp_start as only running job
+    mock_client.command.return_value = Mock(written_rows=1)
     mock_result_running = Mock()
     mock_result_running.result_rows = [
         [1700000100]
     ]  # Our timestamp_start as only running
-    mock_client.query.side_effect = [
-        mock_result_running_count,  # Check running count
-        None,  # INSERT
-        mock_result_verify,  # Verify our record exists
-        mock_result_running,  # Check running jobs
-    ]
+    mock_client.query.return_value = mock_result_running
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
@@ -1074,9 +1130,17 @@ def test_clickhouse_client_try_mark_start_success(mock_get_client: Mock) -> None
     result = client.try_mark_start(1700000100)
 
     assert result is True
-    assert (
-        mock_client.query.call_count == 4
-    )  # running_count + INSERT + verify + check running
+    # Single round-trip for conditional INSERT, no verification SELECT
+    assert mock_client.command.call_count == 1
+    insert_query = mock_client.command.call_args[0][0]
+    assert "INSERT INTO" in insert_query
+    # Timestamp is bound server-side, query text does not change per call
+    assert "toDateTime({timestamp_start:UInt32})" in insert_query
+    assert mock_client.command.call_args[1]["parameters"] == {
+        "timestamp_start": 1700000100
+    }
+    assert "FINAL" not in insert_query
+    assert mock_client.query.call_count == 1  # check running only
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -1087,20 +1151,12 @@ def test_clickhouse_client_try_mark_start_when_other_job_running(
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    # Check running count returns 0, INSERT succeeds, verify our record exists,
-    # but check running jobs shows different timestamp_start
-    mock_result_running_count = Mock()
-    mock_result_running_count.result_rows = [[0]]  # No running jobs
-    mock_result_verify = Mock()
-    mock_result_verify.result_rows = [[1700000100]]  # Our record exists
+    # INSERT writes our record, but check running jobs shows
+    # different timestamp_start
+    mock_client.command.return_value = Mock(written_rows=1)
     mock_result_running = Mock()
     mock_result_running.result_rows = [[1700000200]]  # Different timestamp_start
-    mock_client.query.side_effect = [
-        mock_result_running_count,  # Check running count
-        None,  # INSERT
-        mock_result_verify,  # Verify our record exists
-        mock_result_running,  # Check running jobs (different job)
-    ]
+    mock_client.query.return_value = mock_result_running
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
@@ -1108,9 +1164,8 @@ def test_clickhouse_client_try_mark_start_when_other_job_running(
     result = client.try_mark_start(1700000100)
 
     assert result is False
-    assert (
-        mock_client.query.call_count == 4
-    )  # running_count + INSERT + verify + check running
+    assert mock_client.command.call_count == 1
+    assert mock_client.query.call_count == 1
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -1121,23 +1176,15 @@ def test_clickhouse_client_try_mark_start_when_multiple_jobs_running(
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    # Check running count returns 0, INSERT succeeds, verify our record exists,
-    # but check running jobs shows multiple running jobs
-    mock_result_running_count = Mock()
-    mock_result_running_count.result_rows = [[0]]  # No running jobs
-    mock_result_verify = Mock()
-    mock_result_verify.result_rows = [[1700000100]]  # Our record exists
+    # INSERT writes our record, but check running jobs shows
+    # multiple running jobs
+    mock_client.command.return_value = Mock(written_rows=1)
     mock_result_running = Mock()
     mock_result_running.result_rows = [
         [1700000200],
         [1700000100],
     ]  # Multiple jobs
-    mock_client.query.side_effect = [
-        mock_result_running_count,  # Check running count
-        None,  # INSERT
-        mock_result_verify,  # Verify our record exists
-        mock_result_running,  # Check running jobs (multiple)
-    ]
+    mock_client.query.return_value = mock_result_running
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
@@ -1145,9 +1192,8 @@ def test_clickhouse_client_try_mark_start_when_multiple_jobs_running(
     result = client.try_mark_start(1700000100)
 
     assert result is False
-    assert (
-        mock_client.query.call_count == 4
-    )  # running_count + INSERT + verify + check running
+    assert mock_client.command.call_count == 1
+    assert mock_client.query.call_count == 1
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
@@ -1158,7 +1204,7 @@ def test_clickhouse_client_try_mark_start_handles_query_error(
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    mock_client.query.side_effect = Exception("Query failed")
+    mock_client.command.side_effect = Exception("Query failed")
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
@@ -1168,24 +1214,15 @@ def test_clickhouse_client_try_mark_start_handles_query_error(
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_try_mark_start_verify_fails(
+def test_clickhouse_client_try_mark_start_no_rows_written(
     mock_get_client: Mock,
 ) -> None:
-    """try_mark_start() should return False when INSERT succeeds but verify fails."""
+    """try_mark_start() should return False when INSERT writes no rows."""
     mock_client = Mock()
     mock_get_client.return_value = mock_client
 
-    # Check running count returns 0, INSERT succeeds, but verify query
-    # doesn't find our record (empty result_rows)
-    mock_result_running_count = Mock()
-    mock_result_running_count.result_rows = [[0]]  # No running jobs
-    mock_result_verify = Mock()
-    mock_result_verify.result_rows = []  # Record not found after INSERT
-    mock_client.query.side_effect = [
-        mock_result_running_count,  # Check running count
-        None,  # INSERT
-        mock_result_verify,  # Verify our record exists (empty - not found)
-    ]
+    # Subquery condition found a running job, so nothing was inserted
+    mock_client.command.return_value = Mock(written_rows=0)
 
     cfg = _make_clickhouse_config()
     client = ClickHouseClient(cfg)
@@ -1193,108 +1230,29 @@ def test_clickhouse_client_try_mark_start_verify_fails(
     result = client.try_mark_start(1700000100)
 
     assert result is False
-    assert mock_client.query.call_count == 3  # running_count + INSERT + verify
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_with_naive_datetime(mock_get_client: Mock) -> None:
-    """get_state() should handle naive datetime from ClickHouse.
-
-    Tests _to_unix_timestamp() with naive datetime (no tzinfo).
-    ClickHouse returns naive datetime objects, which should be
-    treated as UTC.
-    """
-    from datetime import datetime
-
-    mock_client = Mock()
-    mock_result = Mock()
-    # ClickHouse returns naive datetime objects (no timezone info)
-    naive_dt = datetime(2023, 11, 15, 10, 0, 0)  # No timezone info
-    mock_result.result_rows = [(naive_dt, naive_dt, naive_dt, 300, 100, 5)]
-    mock_client.query.return_value = mock_result
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config()
-    client = ClickHouseClient(cfg)
-
-    state = client.get_state()
-
-    # Should convert naive datetime to UTC timestamp
-    # datetime(2023, 11, 15, 10, 0, 0) in UTC = 1700042400 Unix timestamp
-    assert state["timestamp_start"] == 1700042400
-    assert state["timestamp_end"] == 1700042400
-    assert state["timestamp_progress"] == 1700042400
-    assert state["batch_window_seconds"] == 300
-    assert state["batch_rows"] == 100
-
-
-@patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_with_non_utc_timezone(
-    mock_get_client: Mock,
-) -> None:
-    """get_state() should convert datetime with non-UTC timezone to UTC.
-
-    Tests _to_unix_timestamp() with datetime that has timezone
-    different from UTC. Should convert to UTC before converting
-    to Unix timestamp.
-    """
-    from datetime import datetime, timedelta, timezone
-
-    mock_client = Mock()
-    mock_result = Mock()
-    # ClickHouse may return datetime with timezone (e.g., local timezone)
-    tz = timezone(timedelta(hours=3))  # UTC+3
-    dt_with_tz = datetime(2023, 11, 15, 10, 0, 0, tzinfo=tz)
-    mock_result.result_rows = [(dt_with_tz, dt_with_tz, dt_with_tz, 300, 100, 5)]
-    mock_client.query.return_value = mock_result
-    mock_get_client.return_value = mock_client
-
-    cfg = _make_clickhouse_config()
-    client = ClickHouseClient(cfg)
-
-    state = client.get_state()
-
-    # Should convert to UTC timestamp
-    # datetime(2023, 11, 15, 10, 0, 0, UTC+3) = datetime(2023, 11, 15, 7, 0, 0, UTC)
-    # = 1700031600 Unix timestamp
-    assert state["timestamp_start"] == 1700031600
-    assert state["timestamp_end"] == 1700031600
-    assert state["timestamp_progress"] == 1700031600
-    assert state["batch_window_seconds"] == 300
-    assert state["batch_rows"] == 100
-    assert state["batch_skipped_count"] == 5
+    assert mock_client.command.call_count == 1
+    mock_client.query.assert_not_called()
 
 
 @patch("clickhouse_client.clickhouse_connect.get_client")
-def test_clickhouse_client_get_state_with_utc_timezone(
-    mock_get_client: Mock,
+@patch("clickhouse_client.logger")
+def test_clickhouse_client_try_mark_start_debug_log_only_when_enabled(
+    mock_logger: Mock, mock_get_client: Mock
 ) -> None:
-    """get_state() should handle datetime already in UTC timezone.
-
-    Tests _to_unix_timestamp() with datetime that already has UTC timezone.
-    Should skip timezone conversion and go directly to timestamp conversion.
-    This covers the branch 124->127 where elif condition is False.
-    """
-    from datetime import datetime, timezone
-
+    """try_mark_start() should build the debug record only if DEBUG is enabled."""
     mock_client = Mock()
-    mock_result = Mock()
-    # ClickHouse may return datetime already in UTC
-    dt_utc = datetime(2023, 11, 15, 10, 0, 0, tzinfo=timezone.utc)
-    mock_result.result_rows = [(dt_utc, dt_utc, dt_utc, 300, 100, 5)]
-    mock_client.query.return_value = mock_result
     mock_get_client.return_value = mock_client
+    mock_client.command.return_value = Mock(written_rows=0)
 
-    cfg = _make_clickhouse_config()
-    client = ClickHouseClient(cfg)
+    client = ClickHouseClient(_make_clickhouse_config())
 
-    state = client.get_state()
+    mock_logger.isEnabledFor.return_value = False
+    client.try_mark_start(1700000100)
+    mock_logger.debug.assert_not_called()
 
-    # Should use datetime as-is (already in UTC)
-    # datetime(2023, 11, 15, 10, 0, 0, UTC) = 1700042400 Unix timestamp
-    assert state["timestamp_start"] == 1700042400
-    assert state["timestamp_end"] == 1700042400
-    assert state["timestamp_progress"] == 1700042400
-    assert state["batch_window_seconds"] == 300
-    assert state["batch_rows"] == 100
-    assert state["batch_skipped_count"] == 5
+    mock_logger.isEnabledFor.return_value = True
+    client.try_mark_start(1700000100)
+    mock_logger.debug.assert_called_once()
+    extra = mock_logger.debug.call_args[1]["extra"]
+    assert extra["clickhouse_client.try_mark_start.written_rows"] == 0
+    assert extra["clickhouse_client.try_mark_start.timestamp_start"] == 1700000100
@@ -41,9 +41,29 @@ def test_load_config_validation_error_missing_required_field(monkeypatch) -> Non
     monkeypatch.setenv("CLICKHOUSE_URL", "http://ch:8123")
     monkeypatch.setenv("CLICKHOUSE_TABLE_METRICS", "db.tbl")
 
-    with pytest.raises(ValueError, match="Configuration validation failed"):
+    with pytest.raises(ValueError, match="Configuration validation failed") as exc:
         load_config()
 
+    # Compact message: model, field location and reason, no docs URL
+    assert str(exc.value) == (
+        "Configuration validation failed: PrometheusConfig: url: Field required"
+    )
+
+
+def test_load_config_validation_error_model_level(monkeypatch) -> None:
+    """load_config should omit empty location for model-level validator errors."""
+    monkeypatch.setenv("PROMETHEUS_URL", "http://prom:9090")
+    monkeypatch.setenv("CLICKHOUSE_URL", "http:///x")
+    monkeypatch.setenv("CLICKHOUSE_TABLE_METRICS", "db.tbl")
+
+    with pytest.raises(ValueError) as exc:
+        load_config()
+
+    assert str(exc.value) == (
+        "Configuration validation failed: ClickHouseConfig: "
+        "Value error, Invalid URL: missing hostname in http:///x"
+    )
+
 
 def test_clickhouse_config_normalizes_password_when_user_specified(monkeypatch) -> None:
     """ClickHouseConfig should normalize None password to empty string when user is set.
@@ -117,6 +137,48 @@ def test_prometheus_config_keeps_none_password_when_no_user(monkeypatch) -> None
     assert cfg.password is None
 
 
+def test_clickhouse_config_parses_url() -> None:
+    """ClickHouseConfig should parse host, port and scheme from url once."""
+    from config import ClickHouseConfig
+
+    cfg = ClickHouseConfig(_env_file=[], url="http://ch:9000")
+    assert (cfg.host, cfg.port, cfg.secure) == ("ch", 9000, False)
+
+    # Default ports depend on scheme
+    cfg = ClickHouseConfig(_env_file=[], url="http://ch")
+    assert (cfg.host, cfg.port, cfg.secure) == ("ch", 8123, False)
+    cfg = ClickHouseConfig(_env_file=[], url="https://ch")
+    assert (cfg.host, cfg.port, cfg.secure) == ("ch", 8443, True)
+
+
+def test_clickhouse_config_rejects_url_without_hostname() -> None:
+    """ClickHouseConfig should fail at load time for URL without hostname."""
+    from pydantic import ValidationError
+
+    from config import ClickHouseConfig
+
+    with pytest.raises(ValidationError, match="Invalid URL: missing hostname"):
+        ClickHouseConfig(_env_file=[], url="http://")
+
+
+def test_clickhouse_config_insert_chunk_size(monkeypatch) -> None:
+    """ClickHouseConfig should default insert_chunk_size to 1 MiB and reject zero."""
+    from pydantic import ValidationError
+
+    from config import ClickHouseConfig
+
+    cfg = ClickHouseConfig(_env_file=[], url="http://ch:8123")
+    assert cfg.insert_chunk_size == 1024 * 1024
+
+    monkeypatch.setenv("CLICKHOUSE_INSERT_CHUNK_SIZE", "65536")
+    cfg = ClickHouseConfig(_env_file=[], url="http://ch:8123")
+    assert cfg.insert_chunk_size == 65536
+
+    monkeypatch.setenv("CLICKHOUSE_INSERT_CHUNK_SIZE", "0")
+    with pytest.raises(ValidationError):
+        ClickHouseConfig(_env_file=[], url="http://ch:8123")
+
+
 def test_clickhouse_config_has_default_table_metrics(monkeypatch) -> None:
     """ClickHouseConfig should have default table_metrics name when not specified."""
     from config import ClickHouseConfig
@@ -226,3 +288,35 @@ def test_etl_config_accepts_zero_overlap(monkeypatch) -> None:
     cfg = EtlConfig()
 
     assert cfg.batch_window_overlap_seconds == 0
+
+
+def test_settings_share_base_model_config() -> None:
+    """All settings classes should inherit shared config and set own prefix."""
+    from config import ClickHouseConfig, EtlConfig, PrometheusConfig
+
+    prefixes = {
+        PrometheusConfig: "PROMETHEUS_",
+        ClickHouseConfig: "CLICKHOUSE_",
+        EtlConfig: "",
+    }
+    for settings_cls, prefix in prefixes.items():
+        model_config = settings_cls.model_config
+        assert model_config["env_prefix"] == prefix
+        assert model_config["case_sensitive"] is False
+        assert model_config["extra"] == "ignore"
+        assert model_config["env_ignore_empty"] is True
+
+
+def test_load_config_validation_error_does_not_echo_input(monkeypatch) -> None:
+    """load_config error message should not include rejected input values."""
+    monkeypatch.setenv("PROMETHEUS_URL", "http://prom:9090")
+    monkeypatch.setenv("PROMETHEUS_TIMEOUT", "secret-looking-value")
+    monkeypatch.setenv("CLICKHOUSE_URL", "http://ch:8123")
+
+    with pytest.raises(ValueError) as exc:
+        load_config()
+
+    message = str(exc.value)
+    assert "timeout: " in message
+    assert "secret-looking-value" not in message
+    assert "errors.pydantic.dev" not in message
@@ -2,6 +2,7 @@
 Comprehensive tests for EtlJob.
 """
 
+import struct
 from typing import Any
 
 import pytest
@@ -120,60 +121,54 @@ class DummyClickHouseClient:
             return
 
         rows: list[dict[str, Any]] = []
-        with open(file_path, "r", encoding="utf-8", newline="") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                # TabSeparated format: timestamp, name, labels.key[], labels.value[],
-                # value (columns separated by tab)
-                # Arrays are in ClickHouse format: ['a','b'] or []
-                parts = line.split("\t")
-                if len(parts) < 5:
-                    continue
-
-                # Parse ClickHouse array format ['a','b'] to Python list
-                # Simple parser: remove brackets and split by comma, handle quotes
-                def parse_clickhouse_array(arr_str: str) -> list[str]:
-                    if arr_str == "[]":
-                        return []
-                    # Remove brackets and parse quoted strings
-                    # Format: ['a','b'] -> ['a', 'b']
-                    content = arr_str.strip("[]")
-                    if not content:
-                        return []
-                    # Split by ',' but respect quotes
-                    # This is simplified - assumes no commas in values
-                    elements = []
-                    current = ""
-                    in_quotes = False
-                    for char in content:
-                        if char == "'" and not (current and current[-1] == "\\"):
-                            in_quotes = not in_quotes
-                            if not in_quotes:
-                                elements.append(current)
-                                current = ""
-                        elif in_quotes:
-                            if char == "\\" and current and current[-1] == "\\":
-                                current = current[:-1] + char
-                            else:
-                                current += char
-                    if current:
-                        elements.append(current)
-                    return elements
-
-                labels_keys = parse_clickhouse_array(parts[2])
-                labels_values = parse_clickhouse_array(parts[3])
-                # Convert to dict format for compatibility with existing tests
-                rows.append(
-                    {
-                        "timestamp": float(parts[0]),
-                        "name": parts[1],
-                        "labels.key": labels_keys,
-                        "labels.value": labels_values,
-                        "value": float(parts[4]),
-                    }
-                )
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        # RowBinary format: timestamp (Int64 microseconds), name (String),
+        # labels.key (Array(String)), labels.value (Array(String)),
+        # value (Float64). Strings and arrays are prefixed with LEB128 length.
+        pos = 0
+
+        def read_varint() -> int:
+            nonlocal pos
+            result = 0
+            shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                result |= (byte & 0x7F) << shift
+                if not byte & 0x80:
+                    return result
+                shift += 7
+
+        def read_string() -> str:
+            nonlocal pos
+            length = read_varint()
+            value = data[pos : pos + length].decode("utf-8")
+            pos += length
+            return value
+
+        def read_string_array() -> list[str]:
+            return [read_string() for _ in range(read_varint())]
+
+        while pos < len(data):
+            (timestamp_us,) = struct.unpack_from("<q", data, pos)
+            pos += 8
+            name = read_string()
+            labels_keys = read_string_array()
+            labels_values = read_string_array()
+            (value,) = struct.unpack_from("<d", data, pos)
+            pos += 8
+            # Convert to dict format for compatibility with existing tests
+            rows.append(
+                {
+                    "timestamp": timestamp_us / 1_000_000,
+                    "name": name,
+                    "labels.key": labels_keys,
+                    "labels.value": labels_values,
+                    "value": value,
+                }
+            )
         if rows:
             self.inserts.append(rows)
 
@@ -988,66 +983,12 @@ def test_etl_job_fetch_data_handles_float_timestamp() -> None:
     assert rows[2]["timestamp"] == 1700000000.4
 
 
-def test_etl_job_format_float_no_scientific_notation() -> None:
-    """EtlJob._format_float should format floats without scientific notation."""
-    # Test normal case (no scientific notation)
-    result = EtlJob._format_float(123.456)
-    assert result == "123.456"
-    assert "e" not in result.lower()
-
-    # Test very small number that would use scientific notation with .15g
-    # 1e-20 will definitely use scientific notation with .15g format
-    result = EtlJob._format_float(1e-20)
-    assert "e" not in result.lower()
-    # Very small numbers may round to "0" after formatting, which is acceptable
-
-    # Test very large number that would use scientific notation with .15g
-    # 1e20 will definitely use scientific notation with .15g format
-    result = EtlJob._format_float(1e20)
-    assert "e" not in result.lower()
-    assert len(result) > 0
-
-    # Test zero
-    result = EtlJob._format_float(0.0)
-    assert result == "0"
-
-    # Test integer-like float
-    result = EtlJob._format_float(42.0)
-    assert result == "42"
-
-    # Test negative number
-    result = EtlJob._format_float(-123.456)
-    assert result == "-123.456"
-    assert "e" not in result.lower()
-
-    # Test edge case: number that would use scientific notation
-    # This should trigger the fallback to .15f format
-    very_small = 1e-25
-    result = EtlJob._format_float(very_small)
-    assert "e" not in result.lower()
-    # Very small numbers may round to "0" after formatting, which is acceptable
-
-
-def test_etl_job_format_float_handles_special_values() -> None:
-    """EtlJob._format_float should format NaN and Inf correctly for ClickHouse."""
-    import math
-
-    # Test NaN - ClickHouse expects "nan" (lowercase)
-    result = EtlJob._format_float(float("nan"))
-    assert result == "nan"
-
-    # Test positive infinity - ClickHouse expects "inf" (lowercase)
-    result = EtlJob._format_float(float("inf"))
-    assert result == "inf"
-
-    # Test negative infinity - ClickHouse expects "-inf" (lowercase)
-    result = EtlJob._format_float(float("-inf"))
-    assert result == "-inf"
-
-    # Verify these are actual special values
-    assert math.isnan(float("nan"))
-    assert math.isinf(float("inf"))
-    assert math.isinf(float("-inf"))
+def test_etl_job_encode_varint() -> None:
+    """EtlJob._encode_varint should encode lengths as unsigned LEB128."""
+    assert EtlJob._encode_varint(0) == b"\x00"
+    assert EtlJob._encode_varint(127) == b"\x7f"
+    assert EtlJob._encode_varint(128) == b"\x80\x01"
+    assert EtlJob._encode_varint(300) == b"\xac\x02"
 
 
 def test_etl_job_fetch_data_handles_scientific_notation_values() -> None:
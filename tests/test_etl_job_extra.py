@@ -7,18 +7,19 @@ from etl_job import EtlJob
 from tests.test_etl_job import DummyClickHouseClient, DummyPromClient, _make_config
 
 
-def test_escape_tabseparated_chars():
-    raw = "back\\slash\tnewline\nend"
-    escaped = EtlJob._escape_tabseparated_chars(raw)
-    assert escaped == "back\\\\slash\\tnewline\\nend"
+def test_encode_rowbinary_string():
+    raw = "back\\slash\tnewline\nend'é"
+    encoded = EtlJob._encode_rowbinary_string(raw)
+    # No escaping in RowBinary: length in bytes followed by UTF-8 bytes
+    assert encoded == bytes([len(raw.encode())]) + raw.encode()
 
 
-def test_format_clickhouse_array():
-    arr = ["a'b", "c\\d", "e\tf", "g\nh"]
-    formatted = EtlJob._format_clickhouse_array(arr)
-    # Expected ClickHouse array string with escaped characters
-    expected = "['a\\'b','c\\\\d','e\\tf','g\\nh']"
-    assert formatted == expected
+def test_encode_rowbinary_string_array():
+    arr = ["a'b", "c\\d", ""]
+    encoded = EtlJob._encode_rowbinary_string_array(arr)
+    # Array size, then each element as length-prefixed string
+    assert encoded == b"\x03\x03a'b\x03c\\d\x00"
+    assert EtlJob._encode_rowbinary_string_array([]) == b"\x00"
 
 
 def test_create_temp_file_creates_file(tmp_path):
@@ -67,7 +68,7 @@ def test_stream_parse_skips_invalid_value_and_counts_skipped():
                 clickhouse_client=DummyClickHouseClient(),
             )
             rows, series, skipped = job._stream_parse_prometheus_response(
-                f, io.StringIO()
+                f, io.BytesIO()
             )
             # One valid row should be written, one series processed, one skipped pair
             assert rows == 1
@@ -1,21 +1,25 @@
 import io
 import json
+import math
 import os
+import struct
 import tempfile
 
 from etl_job import EtlJob
 from tests.test_etl_job import DummyClickHouseClient, DummyPromClient, _make_config
 
 
-def test_format_float_special_values():
-    # NaN should be formatted as 'nan' (lowercase) for ClickHouse
-    assert EtlJob._format_float(float("nan")) == "nan"
-    # Positive infinity should be formatted as 'inf'
-    assert EtlJob._format_float(float("inf")) == "inf"
-    # Negative infinity should be formatted as '-inf'
-    assert EtlJob._format_float(float("-inf")) == "-inf"
-    # Regular float should be formatted without scientific notation
-    assert EtlJob._format_float(1234.5678) == "1234.5678"
+def test_make_row_struct_special_values():
+    series_columns = b"\x02up\x00\x00"
+    row_struct = EtlJob._make_row_struct(series_columns)
+    # NaN, Inf and -Inf are preserved exactly as Float64
+    packed = row_struct.pack(1700000000123456, series_columns, float("nan"))
+    assert math.isnan(struct.unpack("<d", packed[-8:])[0])
+    for value in (float("inf"), float("-inf"), 1234.5678, 1e-20):
+        packed = row_struct.pack(1700000000123456, series_columns, value)
+        assert struct.unpack("<q", packed[:8])[0] == 1700000000123456
+        assert packed[8:-8] == series_columns
+        assert struct.unpack("<d", packed[-8:])[0] == value
 
 
 def test_stream_parse_handles_all_value_variants():
@@ -50,7 +54,7 @@ def test_stream_parse_handles_all_value_variants():
                 clickhouse_client=DummyClickHouseClient(),
             )
             rows, series, skipped = job._stream_parse_prometheus_response(
-                f, io.StringIO()
+                f, io.BytesIO()
             )
             # Expected: 5 valid rows (all except the invalid string)
             assert rows == 5
@@ -73,7 +77,7 @@ def _run_parse(response: dict) -> tuple[int, int, int]:
                 prometheus_client=DummyPromClient(),
                 clickhouse_client=DummyClickHouseClient(),
             )
-            return job._stream_parse_prometheus_response(f, io.StringIO())
+            return job._stream_parse_prometheus_response(f, io.BytesIO())
     finally:
         os.unlink(tmp_file.name)
 
@@ -52,6 +52,7 @@ def test_main_success(
         clickhouse_client=mock_ch,
     )
     mock_job.run_once.assert_called_once()
+    mock_ch.close.assert_called_once()
 
 
 @patch("main.EtlJob")
@@ -106,3 +107,42 @@ def test_main_etl_job_error(
     main()
 
     mock_exit.assert_called_once_with(1)
+
+
+@patch("main.EtlJob")
+@patch("main.ClickHouseClient")
+@patch("main.PrometheusClient")
+@patch("main.load_config")
+@patch("main.sys.exit")
+def test_main_closes_clickhouse_client_on_job_error(
+    mock_exit: Mock,
+    mock_load_config: Mock,
+    mock_prom_client: Mock,
+    mock_ch_client: Mock,
+    mock_etl_job: Mock,
+) -> None:
+    """main() should close ClickHouse client even when ETL job fails."""
+    from config import (
+        ClickHouseConfig,
+        Config,
+        EtlConfig,
+        PrometheusConfig,
+    )
+
+    mock_load_config.return_value = Config(
+        prometheus=PrometheusConfig(url="http://prom:9090"),
+        clickhouse=ClickHouseConfig(url="http://ch:8123", table_metrics="db.tbl"),
+        etl=EtlConfig(),
+    )
+
+    mock_ch = Mock()
+    mock_ch_client.return_value = mock_ch
+
+    mock_job = Mock()
+    mock_job.run_once.side_effect = Exception("ETL job failed")
+    mock_etl_job.return_value = mock_job
+
+    main()
+
+    mock_exit.assert_called_once_with(1)
+    mock_ch.close.assert_called_once()
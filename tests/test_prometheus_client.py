@@ -131,7 +131,10 @@ def test_prometheus_client_query_range_to_file_success(
     content = file_path.read_bytes()
     assert b"status" in content
     assert b"up" in content
-    mock_response.iter_content.assert_called_once_with(chunk_size=8192)
+    mock_response.iter_content.assert_called_once_with(chunk_size=1024 * 1024)
+    # Body must be streamed, not buffered in memory by requests
+    assert mock_get.call_args[1]["stream"] is True
+    mock_response.close.assert_called_once()
 
 
 @patch("prometheus_client.requests.get")
@@ -163,6 +166,7 @@ def test_prometheus_client_query_range_to_file_http_error(
 
     # File should not be created on error
     assert not file_path.exists()
+    mock_response.close.assert_called_once()
 
 
 @patch("prometheus_client.requests.get")
@@ -193,6 +197,48 @@ def test_prometheus_client_query_range_to_file_write_error(
         )
 
 
+@patch("prometheus_client.requests.get")
+@patch("prometheus_client.logger")
+def test_prometheus_client_query_range_to_file_download_error(
+    mock_logger: Mock, mock_get: Mock, tmp_path
+) -> None:
+    """query_range_to_file() should log body download errors as request failures."""
+    config = _make_prometheus_config()
+    client = PrometheusClient(config)
+
+    mock_response = Mock(spec=requests.Response)
+    mock_response.status_code = 200
+    mock_response.url = "http://prom:9090/api/v1/query_range"
+    mock_response.raise_for_status.return_value = None
+    # ChunkedEncodingError is an OSError subclass raised while streaming body
+    mock_response.iter_content.side_effect = requests.exceptions.ChunkedEncodingError(
+        "Connection broken"
+    )
+    mock_get.return_value = mock_response
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.query_range_to_file(
+            "up",
+            start=1700000000,
+            end=1700000300,
+            step="300s",
+            file_path=str(tmp_path / "response.json"),
+        )
+
+    mock_logger.error.assert_called_once()
+    call_args = mock_logger.error.call_args
+    assert call_args[0][0] == "Prometheus query_range request failed"
+    extra = call_args[1]["extra"]
+    assert extra["prometheus_client.query_range_request_failed.error_type"] == (
+        "ChunkedEncodingError"
+    )
+    assert extra["prometheus_client.query_range_request_failed.expression"] == "up"
+    assert extra["prometheus_client.query_range_request_failed.url"] == (
+        "http://prom:9090/api/v1/query_range"
+    )
+    mock_response.close.assert_called_once()
+
+
 @patch("prometheus_client.requests.get")
 @patch("prometheus_client.logger")
 def test_prometheus_client_execute_request_timeout(